@@ -10,6 +10,7 @@ import functools
 import os
 import sys
 import warnings
+from array import array as _pyarray
 import numpy as np
 from numpy import array, ndarray, float64, int32, empty, prod
 from ctypes import c_int, c_double, c_char_p, c_void_p, c_uint8, c_uint, c_ulong
@@ -3808,8 +3809,12 @@ def volume_nogrid(data, algorithm, kernel, radius, extra_data=None):
 
     radius_f = _radius_f(radius_f)
 
-    dmin = c_double(-1)
-    dmax = c_double(-1)
+    # dmin and dmax share one contiguous buffer, so no ctypes objects need to
+    # be created and wrapped with byref() for every call
+    dminmax = _pyarray('d', [-1.0, -1.0])
+    dminmax_address = dminmax.buffer_info()[0]
+    dmin = cast(dminmax_address, POINTER(c_double))
+    dmax = cast(dminmax_address + dminmax.itemsize, POINTER(c_double))
 
     data = np.array(data, copy=copy_if_needed, ndmin=2)
     shape = data.shape
@@ -3819,9 +3824,9 @@ def volume_nogrid(data, algorithm, kernel, radius, extra_data=None):
     cnt = shape[0]
     _data = floatarray(cnt * 4, data)
 
-    __gr.gr_volume_nogrid(cnt, cast(_data.data, POINTER(_data_point3d_t)), c_void_p(extra_data), algorithm, kernel, byref(dmin), byref(dmax), radius_d, radius_f)
+    __gr.gr_volume_nogrid(cnt, cast(_data.data, POINTER(_data_point3d_t)), c_void_p(extra_data), algorithm, kernel, dmin, dmax, radius_d, radius_f)
 
-    return dmin.value, dmax.value
+    return dminmax[0], dminmax[1]
 
 
 @_require_runtime_version(0, 67, 0, 0)
@@ -9,13 +9,27 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 
-import functools
+import collections
+import math
+import os
+import re
 import sys
 import warnings
+import weakref
 import numpy as np
 import gr
 import gr3
 
+try:
+    import numba
+except ImportError:
+    numba = None
+
+try:
+    from fast_histogram import histogram1d as _fast_histogram1d
+except ImportError:
+    _fast_histogram1d = None
+
 
 try:
     basestring
@@ -27,27 +41,68 @@ if np.lib.NumpyVersion(np.__version__) >= "2.0.0":
     copy_if_needed = None
 
 
-def _close_gks_on_error(func):
+class _GKSGuard(object):
     """
-    Wrap an API function to make sure GKS is closed on error.
+    Context manager to make sure GKS is closed on error.
 
     Not closing GKS after an error occurred during plotting could lead to
     an unexpected GKS state, e.g. printing of more than one output page.
 
-    :param func: the mlab API function to wrap
-    :return: the wrapped API function
+    The mlab API functions wrap their bodies in the shared instance
+    ``_guard_gks`` instead of using a decorator. This avoids the extra
+    ``functools.wraps`` wrapper frame and the repacking of ``*args`` and
+    ``**kwargs`` per API call; ``__enter__`` and ``__exit__`` are still
+    called each time.
     """
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        try:
-            return func(*args, **kwargs)
-        except Exception:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None and issubclass(exc_type, Exception):
             gr.emergencyclosegks()
-            raise
-    return wrapper
+        return False
+
+
+_guard_gks = _GKSGuard()
+
+
+class _LRUCache(object):
+    """
+    Mapping with at most `size` entries, which evicts the least recently used
+    entry when a new one is added.
+    """
+    __slots__ = ('size', '_entries')
+
+    def __init__(self, size):
+        self.size = size
+        self._entries = collections.OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            value = self._entries.pop(key)
+        except KeyError:
+            return default
+        # re-insert the entry to mark it as most recently used
+        self._entries[key] = value
+        return value
+
+    def put(self, key, value):
+        if key in self._entries:
+            del self._entries[key]
+        else:
+            while len(self._entries) >= self.size:
+                self._entries.popitem(last=False)
+        self._entries[key] = value
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
 
 
-@_close_gks_on_error
 def plot(*args, **kwargs):
     """
     Draw one or more line plots.
@@ -72,16 +127,19 @@ def plot(*args, **kwargs):
     >>> # Plot y, using its indices for the x values
     >>> mlab.plot(y)
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    if _plt.kwargs['ax']:
-        _plt.args += _plot_args(args)
-    else:
-        _plt.args = _plot_args(args)
-    return _plot_data(kind='line')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        parsed = _plot_args(args)
+        if kw.get('ax'):
+            plt.args.extend(parsed)
+        else:
+            plt.args = parsed
+        return _plot_data(kind='line')
 
 
-@_close_gks_on_error
 def oplot(*args, **kwargs):
     """
     Draw one or more line plots over another plot.
@@ -104,13 +162,15 @@ def oplot(*args, **kwargs):
     >>> # Plot graph over it
     >>> mlab.oplot(x, lambda x: x**3 + x**2 + x)
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    _plt.args += _plot_args(args)
-    return _plot_data(kind='line')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        plt.args.extend(_plot_args(args))
+        return _plot_data(kind='line')
 
 
-@_close_gks_on_error
 def step(*args, **kwargs):
     """
     Draw one or more step or staircase plots.
@@ -142,18 +202,21 @@ def step(*args, **kwargs):
     >>> # Use next y step immediately before next x position
     >>> mlab.step(y, where='post')
     """
-    global _plt
-    if 'where' in kwargs:
-        _plt.kwargs['step_where'] = kwargs.pop('where')
-    _plt.kwargs.update(kwargs)
-    if _plt.kwargs['ax']:
-        _plt.args += _plot_args(args)
-    else:
-        _plt.args = _plot_args(args)
-    return _plot_data(kind='step')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if 'where' in kwargs:
+            kw['step_where'] = kwargs.pop('where')
+        if kwargs:
+            kw.update(kwargs)
+        parsed = _plot_args(args)
+        if kw.get('ax'):
+            plt.args.extend(parsed)
+        else:
+            plt.args = parsed
+        return _plot_data(kind='step')
 
 
-@_close_gks_on_error
 def scatter(*args, **kwargs):
     """
     Draw one or more scatter plots.
@@ -189,13 +252,15 @@ def scatter(*args, **kwargs):
     >>> c = np.linspace(0, 255, 11)
     >>> mlab.scatter(x, y, s, c)
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    _plt.args = _plot_args(args, fmt='xyac')
-    return _plot_data(kind='scatter')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        plt.args = _plot_args(args, fmt='xyac')
+        return _plot_data(kind='scatter')
 
 
-@_close_gks_on_error
 def quiver(x, y, u, v, **kwargs):
     """
     Draw a quiver plot.
@@ -217,13 +282,15 @@ def quiver(x, y, u, v, **kwargs):
     >>> # Draw arrows on grid
     >>> mlab.quiver(x, y, u, v)
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    _plt.args = _plot_args((x, y, u, v), fmt='xyuv')
-    return _plot_data(kind='quiver')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        plt.args = _plot_args((x, y, u, v), fmt='xyuv')
+        return _plot_data(kind='quiver')
 
 
-@_close_gks_on_error
 def polar(*args, **kwargs):
     """
     Draw one or more polar plots.
@@ -245,13 +312,15 @@ def polar(*args, **kwargs):
     >>> # Plot angles and a callable
     >>> mlab.polar(angles, lambda radius: math.cos(radius)**2)
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    _plt.args = _plot_args(args)
-    return _plot_data(kind='polar')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        plt.args = _plot_args(args)
+        return _plot_data(kind='polar')
 
 
-@_close_gks_on_error
 def trisurf(*args, **kwargs):
     """
     Draw a triangular surface plot.
@@ -275,13 +344,15 @@ def trisurf(*args, **kwargs):
     >>> # Draw the triangular surface plot
     >>> mlab.trisurf(x, y, z)
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    _plt.args = _plot_args(args, fmt='xyzc')
-    return _plot_data(kind='trisurf')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        plt.args = _plot_args(args, fmt='xyzc')
+        return _plot_data(kind='trisurf')
 
 
-@_close_gks_on_error
 def tricont(x, y, z, *args, **kwargs):
     """
     Draw a triangular contour plot.
@@ -305,14 +376,16 @@ def tricont(x, y, z, *args, **kwargs):
     >>> # Draw the triangular contour plot
     >>> mlab.tricont(x, y, z)
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    args = [x, y, z] + list(args)
-    _plt.args = _plot_args(args, fmt='xyzc')
-    return _plot_data(kind='tricont')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        args = [x, y, z] + list(args)
+        plt.args = _plot_args(args, fmt='xyzc')
+        return _plot_data(kind='tricont')
 
 
-@_close_gks_on_error
 def stem(*args, **kwargs):
     """
     Draw a stem plot.
@@ -337,26 +410,152 @@ def stem(*args, **kwargs):
     >>> # Plot y, using its indices for the x values
     >>> mlab.stem(y)
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    _plt.args = _plot_args(args)
-    return _plot_data(kind='stem')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        plt.args = _plot_args(args)
+        return _plot_data(kind='stem')
+
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _hist_numba(x, edges, chunk_counts):
+        num_chunks, nbins = chunk_counts.shape
+        chunk_size = (len(x) + num_chunks - 1) // num_chunks
+        x_min = edges[0]
+        x_range = edges[nbins] - x_min
+        # every thread counts into its own row, the rows are reduced at the end
+        for chunk in numba.prange(num_chunks):
+            chunk_counts[chunk, :] = 0
+            for i in range(chunk * chunk_size, min(len(x), (chunk + 1) * chunk_size)):
+                value = x[i]
+                bin_index = int((value - x_min) / x_range * nbins)
+                if bin_index >= nbins:
+                    bin_index = nbins - 1
+                # the computed index may be off by one next to an edge, so it is corrected
+                # against the edges like np.histogram does
+                if value < edges[bin_index]:
+                    bin_index -= 1
+                elif bin_index < nbins - 1 and value >= edges[bin_index + 1]:
+                    bin_index += 1
+                chunk_counts[chunk, bin_index] += 1
+        return chunk_counts.sum(axis=0)
+
+    @numba.njit(parallel=True, cache=True)
+    def _bin_edges_numba(x, edges, chunk_counts):
+        num_chunks, num_edges = chunk_counts.shape
+        chunk_size = (len(x) + num_chunks - 1) // num_chunks
+        # counts the values in (edges[i], edges[i + 1]] of the ascending edges
+        for chunk in numba.prange(num_chunks):
+            chunk_counts[chunk, :] = 0
+            for i in range(chunk * chunk_size, min(len(x), (chunk + 1) * chunk_size)):
+                value = x[i]
+                low = 0
+                high = num_edges
+                while low < high:
+                    middle = (low + high) >> 1
+                    if edges[middle] < value:
+                        low = middle + 1
+                    else:
+                        high = middle
+                if 0 < low < num_edges:
+                    chunk_counts[chunk, low - 1] += 1
+        return chunk_counts.sum(axis=0)
+
+    @numba.njit(parallel=True, cache=True)
+    def _squared_length_range_numba(u, v, chunk_range):
+        num_chunks = chunk_range.shape[0]
+        chunk_size = (len(u) + num_chunks - 1) // num_chunks
+        # every thread reduces its own chunk without a temporary array of the lengths
+        for chunk in numba.prange(num_chunks):
+            low = np.inf
+            high = -np.inf
+            for i in range(chunk * chunk_size, min(len(u), (chunk + 1) * chunk_size)):
+                length_squared = u[i] * u[i] + v[i] * v[i]
+                if np.isnan(length_squared):
+                    low = high = length_squared
+                    break
+                if length_squared < low:
+                    low = length_squared
+                if length_squared > high:
+                    high = length_squared
+            chunk_range[chunk, 0] = low
+            chunk_range[chunk, 1] = high
+        return chunk_range
+
+    @numba.njit(parallel=True, cache=True)
+    def _heatmap_colors_numba(data, icmap, rgba):
+        # the range test, the lookup and the masking of invalid values are done in a single pass
+        for row in numba.prange(data.shape[0]):
+            for column in range(data.shape[1]):
+                value = data[row, column]
+                if 0 <= value <= 255:
+                    rgba[row, column] = icmap[int(value)]
+                else:
+                    rgba[row, column] = 0
+        return rgba
+
+    @numba.njit(parallel=True, cache=True)
+    def _colormap_pixmap_numba(column_channels, row_channels, factor, pixmap):
+        # the four channels of a pixel are mixed, truncated and packed without temporary images
+        for row in numba.prange(pixmap.shape[0]):
+            for column in range(pixmap.shape[1]):
+                color = 0
+                for channel in range(4):
+                    value = (column_channels[channel, column] + row_channels[channel, row]) / factor
+                    color |= int(value) << (8 * channel)
+                pixmap[row, column] = color
+        return pixmap
+else:
+    _hist_numba = None
+    _bin_edges_numba = None
+    _squared_length_range_numba = None
+    _heatmap_colors_numba = None
+    _colormap_pixmap_numba = None
+
+# minimum number of values for which the numba binning kernel is used
+_HIST_NUMBA_THRESHOLD = 200000
+
+# minimum number of angles for which fast_histogram bins a polar histogram
+_FAST_HISTOGRAM_THRESHOLD = 200000
+
+# per-thread count buffer and bin edges of the last numba histogram, reused by
+# redraws with the same number of bins and range
+_hist_chunk_counts = None
+_hist_edges = None
 
 
 def _hist(x, nbins=0, weights=None):
-    x = np.array(x)
+    global _hist_chunk_counts, _hist_edges
+    # x is kept in its own dtype: np.histogram only converts it block-wise, so
+    # no float64 copy of the whole input is made
+    x = np.asarray(x)
     x_min = x.min()
     x_max = x.max()
     if nbins <= 1:
-        nbins = int(np.round(3.3 * np.log10(len(x)))) + 1
-    binned_x = np.array(np.floor((x - x_min) / (x_max - x_min) * nbins), dtype=int)
-    binned_x[binned_x == nbins] = nbins - 1
-    counts = np.bincount(binned_x, weights=weights)
-    edges = np.linspace(x_min, x_max, nbins + 1)
+        nbins = int(round(3.3 * math.log10(len(x)))) + 1
+    # the kernel is only compiled for float64 input, other dtypes are binned by np.histogram
+    if _hist_numba is not None and weights is None and x.dtype == np.float64 and x.size > _HIST_NUMBA_THRESHOLD and \
+            x_min < x_max:
+        if not np.isfinite(x_min) or not np.isfinite(x_max):
+            raise ValueError('supplied range of [{}, {}] is not finite'.format(x_min, x_max))
+        if _hist_edges is None or len(_hist_edges) != nbins + 1 or \
+                _hist_edges[0] != x_min or _hist_edges[-1] != x_max:
+            # these are the edges np.histogram uses for float64 input
+            _hist_edges = np.linspace(float(x_min), float(x_max), nbins + 1)
+            # the edges are shared between plots, so they must not be modified
+            _hist_edges.flags.writeable = False
+        num_chunks = numba.get_num_threads()
+        if _hist_chunk_counts is None or _hist_chunk_counts.shape != (num_chunks, nbins):
+            _hist_chunk_counts = np.empty((num_chunks, nbins), np.int64)
+        counts = _hist_numba(x.ravel(), _hist_edges, _hist_chunk_counts)
+        return counts, _hist_edges
+    counts, edges = np.histogram(x, bins=nbins, range=(float(x_min), float(x_max)), weights=weights)
     return counts, edges
 
 
-@_close_gks_on_error
 def histogram(x, num_bins=0, weights=None, **kwargs):
     r"""
     Draw a histogram.
@@ -383,14 +582,16 @@ def histogram(x, num_bins=0, weights=None, **kwargs):
     >>> weights[x < 0] = 2.5
     >>> mlab.histogram(x, weights=weights)
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    hist, bins = _hist(x, nbins=num_bins, weights=weights)
-    _plt.args = [(np.array(bins), np.array(hist), None, None, "")]
-    return _plot_data(kind='hist')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        hist, bins = _hist(x, nbins=num_bins, weights=weights)
+        plt.args = [(bins, hist, None, None, "")]
+        return _plot_data(kind='hist')
 
 
-@_close_gks_on_error
 def contour(*args, **kwargs):
     """
     Draw a contour plot.
@@ -427,13 +628,15 @@ def contour(*args, **kwargs):
     >>> # Draw the contour plot using a callable
     >>> mlab.contour(x, y, lambda x, y: np.sin(x) + np.cos(y))
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    _plt.args = _plot_args(args, fmt='xyzc')
-    return _plot_data(kind='contour')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        plt.args = _plot_args(args, fmt='xyzc')
+        return _plot_data(kind='contour')
 
 
-@_close_gks_on_error
 def contourf(*args, **kwargs):
     """
     Draw a filled contour plot.
@@ -470,13 +673,15 @@ def contourf(*args, **kwargs):
     >>> # Draw the filled contour plot using a callable
     >>> mlab.contourf(x, y, lambda x, y: np.sin(x) + np.cos(y))
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    _plt.args = _plot_args(args, fmt='xyzc')
-    return _plot_data(kind='contourf')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        plt.args = _plot_args(args, fmt='xyzc')
+        return _plot_data(kind='contourf')
 
 
-@_close_gks_on_error
 def hexbin(*args, **kwargs):
     """
     Draw a hexagon binning plot.
@@ -498,13 +703,15 @@ def hexbin(*args, **kwargs):
     >>> # Draw the hexbin plot
     >>> mlab.hexbin(x, y)
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    _plt.args = _plot_args(args)
-    return _plot_data(kind='hexbin')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        plt.args = _plot_args(args)
+        return _plot_data(kind='hexbin')
 
 
-@_close_gks_on_error
 def heatmap(data, **kwargs):
     """
     Draw a heatmap.
@@ -530,18 +737,20 @@ def heatmap(data, **kwargs):
     >>> # Draw the heatmap
     >>> mlab.heatmap(z[::-1, :], xlim=(-2, 2), ylim=(0, np.pi))
     """
-    global _plt
-    data = np.array(data, copy=copy_if_needed)
-    if len(data.shape) != 2:
-        raise ValueError('expected 2-D array')
-    _plt.kwargs.update(kwargs)
-    xlim = _plt.kwargs.get('xlim', None)
-    ylim = _plt.kwargs.get('ylim', None)
-    _plt.args = [(xlim, ylim, data, None, "")]
-    return _plot_data(kind='heatmap')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        data = np.asarray(data)
+        if data.ndim != 2:
+            raise ValueError('expected 2-D array')
+        if kwargs:
+            kw.update(kwargs)
+        xlim = kw.get('xlim', None)
+        ylim = kw.get('ylim', None)
+        plt.args = [(xlim, ylim, data, None, "")]
+        return _plot_data(kind='heatmap')
 
 
-@_close_gks_on_error
 def polar_heatmap(data, **kwargs):
     """
     Draw a polar heatmap.
@@ -567,18 +776,20 @@ def polar_heatmap(data, **kwargs):
     >>> # Draw the heatmap
     >>> mlab.polar_heatmap(z, rlim=(1, 10), philim=(0, np.pi / 2))
     """
-    global _plt
-    data = np.array(data, copy=copy_if_needed)
-    if len(data.shape) != 2:
-        raise ValueError('expected 2-D array')
-    _plt.kwargs.update(kwargs)
-    rlim = _plt.kwargs.get('rlim', None)
-    philim = _plt.kwargs.get('philim', None)
-    _plt.args = [(rlim, philim, data, None, "")]
-    return _plot_data(kind='polar_heatmap')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        data = np.asarray(data)
+        if data.ndim != 2:
+            raise ValueError('expected 2-D array')
+        if kwargs:
+            kw.update(kwargs)
+        rlim = kw.get('rlim', None)
+        philim = kw.get('philim', None)
+        plt.args = [(rlim, philim, data, None, "")]
+        return _plot_data(kind='polar_heatmap')
 
 
-@_close_gks_on_error
 def shade(*args, **kwargs):
     """
     Draw a point or line based heatmap.
@@ -616,13 +827,15 @@ def shade(*args, **kwargs):
     >>> y = np.concatenate((np.random.normal(size=10000), [np.nan], np.random.normal(loc=5, size=10000)))
     >>> mlab.shade(x, y)
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    _plt.args = _plot_args(args, fmt='xys')
-    return _plot_data(kind='shade')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        plt.args = _plot_args(args, fmt='xys')
+        return _plot_data(kind='shade')
 
 
-@_close_gks_on_error
 def wireframe(*args, **kwargs):
     """
     Draw a three-dimensional wireframe plot.
@@ -658,13 +871,15 @@ def wireframe(*args, **kwargs):
     >>> # Draw the wireframe plot using a callable
     >>> mlab.wireframe(x, y, lambda x, y: np.sin(x) + np.cos(y))
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    _plt.args = _plot_args(args, fmt='xyzc')
-    return _plot_data(kind='wireframe')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        plt.args = _plot_args(args, fmt='xyzc')
+        return _plot_data(kind='wireframe')
 
 
-@_close_gks_on_error
 def surface(*args, **kwargs):
     """
     Draw a three-dimensional surface plot.
@@ -700,13 +915,15 @@ def surface(*args, **kwargs):
     >>> # Draw the surface plot using a callable
     >>> mlab.surface(x, y, lambda x, y: np.sin(x) + np.cos(y))
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    _plt.args = _plot_args(args, fmt='xyzc')
-    return _plot_data(kind='surface')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        plt.args = _plot_args(args, fmt='xyzc')
+        return _plot_data(kind='surface')
 
 
-@_close_gks_on_error
 def bar(y, *args, **kwargs):
     """
     Draw a two-dimensional bar plot.
@@ -715,7 +932,8 @@ def bar(y, *args, **kwargs):
     plot. It can receive the following parameters:
 
     - a list of y values, or
-    - a list of same length lists which contain y values (multiple bars)
+    - a list of same length lists which contain y values (multiple bars),
+      sublists of different lengths raise a ValueError
     - a list of colors
     - one or more of the following key value pairs:
         - a parameter bar_width
@@ -767,52 +985,55 @@ def bar(y, *args, **kwargs):
     >>> mlab.bar(yy, bar_style='stacked')
     >>> mlab.bar(yy, [989, 998, 994])
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    if 'bar_style' not in _plt.kwargs:
-        _plt.kwargs['bar_style'] = 'stacked'
-    if isinstance(y[0], list) or (isinstance(y, np.ndarray) and len(y.shape) == 2):
-        if isinstance(y, np.ndarray) and len(y.shape) > 2:
-            raise IndexError('Numpy array has to be of dimension 2 or lower!')
-        _plt.kwargs['multi_bar'] = True
-        if _plt.kwargs['bar_style'] == 'lined':
-            new_arg = []
-            for ls in y:
-                new_arg.append(max(ls))
-        else:
-            new_arg = []
-            for ls in y:
-                new_arg.append(sum(ls))
-        new_args = [new_arg, y]
-    else:
-        _plt.kwargs['multi_bar'] = False
-        new_args = [y, None]
-
-    if args:
-        c = args[0]
-        if not isinstance(c, list):
-            raise TypeError('C has to be of type list!')
-        if _plt.kwargs['multi_bar']:
-            if len(c) != len(y[0]):
-                raise IndexError('The length of c has to equal the length of the sublists when using a multi-bar!')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        if 'bar_style' not in kw:
+            kw['bar_style'] = 'stacked'
+        if isinstance(y[0], list) or (isinstance(y, np.ndarray) and y.ndim == 2):
+            if isinstance(y, np.ndarray) and y.ndim > 2:
+                raise IndexError('Numpy array has to be of dimension 2 or lower!')
+            kw['multi_bar'] = True
+            if not isinstance(y, np.ndarray) and any(len(row) != len(y[0]) for row in y):
+                raise ValueError('All sublists have to have the same length when using a multi-bar!')
+            y_arr = np.ascontiguousarray(y, dtype=np.float64)
+            if kw['bar_style'] == 'lined':
+                agg = y_arr.max(axis=1)
+            else:
+                agg = y_arr.sum(axis=1)
         else:
-            if len(c) != len(y):
-                raise IndexError('The length of c has to equal the amount of y-values!')
-        for color in c:
-            if isinstance(color, int):
-                if color < 0:
-                    raise ValueError('The values in c have to be bigger or equal to 0!')
-            if isinstance(color, list):
-                if len(color) != 3:
+            kw['multi_bar'] = False
+            y_arr = None
+            agg = np.ascontiguousarray(y, dtype=np.float64)
+
+        c = None
+        if args:
+            c = args[0]
+            if not isinstance(c, list):
+                raise TypeError('C has to be of type list!')
+            if kw['multi_bar']:
+                if len(c) != len(y[0]):
+                    raise IndexError('The length of c has to equal the length of the sublists when using a multi-bar!')
+            else:
+                if len(c) != len(y):
+                    raise IndexError('The length of c has to equal the amount of y-values!')
+            int_colors = [color for color in c if isinstance(color, int)]
+            rgb_colors = [color for color in c if isinstance(color, list)]
+            if int_colors and min(int_colors) < 0:
+                raise ValueError('The values in c have to be bigger or equal to 0!')
+            if rgb_colors:
+                if any(len(rgb) != 3 for rgb in rgb_colors):
                     raise IndexError("RGB list has to contain 3 values!")
-                rgb = color
-                for v in rgb:
-                    if v < 0 or v > 1:
-                        raise ValueError('The values of a rgb color have to be in [1;0]!')
-        new_args.append(c)
+                rgb_colors = np.asarray(rgb_colors, dtype=np.float64)
+                if np.any((rgb_colors < 0) | (rgb_colors > 1)):
+                    raise ValueError('The values of a rgb color have to be in [1;0]!')
 
-    _plt.args = _plot_args(new_args, fmt='y')
-    return _plot_data(kind='bar')
+        # the aggregated column and the per-bar values are passed on as arrays, so
+        # the data does not need to be parsed again by _plot_args
+        plt.args = [(np.arange(1, len(agg) + 1), agg, y_arr, c, "")]
+        return _plot_data(kind='bar')
 
 
 def polar_histogram(*args, **kwargs):
@@ -873,6 +1094,13 @@ def polar_histogram(*args, **kwargs):
 
     - draw_edges: Boolean, draws the edges of each bin when using a colormap. Only works with a colormap
 
+    - colormap_resolution: Width and height in pixels of the image used to draw the colormap. Default is 2000.
+      Smaller values need less memory and time when the plot is not displayed at a high resolution
+
+    - radial_gradient: Boolean, draws the colormap as an image with a color for every pixel. If False, each bin is
+      filled with the colormap color at its center instead, which is much faster. Default is True.
+      With stairs, the colormap can only be drawn as a radial gradient, so False is not usable together with stairs
+
     :param args: a list
 
 
@@ -898,27 +1126,14 @@ def polar_histogram(*args, **kwargs):
     _plt.kwargs['ax'] = True
     _plt.args = _plot_args(args, fmt='xys')
 
-    def find_max(classes, normalization):
-        if normalization == 'cumcount':
-            sum = 0
-            for x in range(len(classes)):
-                sum += len(classes[x])
-            return sum
-
-        else:
-            max = len(classes[0])
-            for x in range(len(classes)):
-                if max < len(classes[x]):
-                    max = len(classes[x])
-            return max
-
     _plt.kwargs.update(kwargs)
-    classes = []
     gr.setlinecolorind(1)
     angles = []
 
     # Color Map
     if _plt.kwargs.get('colormap') is not None:
+        if _plt.kwargs.get('stairs', False) is not False and not _plt.kwargs.get('radial_gradient', True):
+            raise ValueError('radial_gradient=False is not usable with stairs')
         is_colormap = True
         colormap = _plt.kwargs['colormap']
         if isinstance(colormap, tuple):
@@ -949,33 +1164,26 @@ def polar_histogram(*args, **kwargs):
     else:
         theta = args[0]
     # theta check
+    theta = np.asarray(theta)
     if len(theta) == 0:
         raise ValueError('List is empty')
-    for obj in theta:
-        if isinstance(obj, float):
-            has_theta = True
-            break
-        elif isinstance(obj, int):
-            has_theta = False
+    # angles are given as floating point values, bin counts as integers
+    has_theta = np.issubdtype(theta.dtype, np.floating) or \
+        (theta.dtype == object and any(isinstance(obj, float) for obj in theta))
 
     if not has_theta:
         if is_binedges:
             if len(binedges) is not len(theta) + 1:
                 raise ValueError('Number bin_edges must be number of Bincounts + 1')
 
-        for x in range(len(theta)):
-            classes.append([])
-            if theta[x] == 0:
-                classes[x].append(None)
-                continue
-            for y in range(theta[x]):
-                classes[x].append(y)
+        counts = np.maximum(np.asarray(theta, dtype=np.int64), 0)
         num_bins = len(theta)
         width = 2 * np.pi / num_bins
 
         if is_colormap:
             if not is_binedges:
-                angles = np.linspace(0, np.pi * 2, num_bins + 1)
+                angle_edges = np.linspace(0, np.pi * 2, num_bins + 1)
+                angles = np.stack((angle_edges[:-1], angle_edges[1:]), axis=1)
 
         # Philim for bincounts
         if _plt.kwargs.get('philim', None) is not None:
@@ -1011,8 +1219,6 @@ def polar_histogram(*args, **kwargs):
             if is_binedges:
                 num_bins = len(binedges) - 1
 
-        start = 0
-
         # Bin Width --> will overwrite the number of bins but it will not exceed 200
 
         if _plt.kwargs.get('bin_width') is not None:
@@ -1051,72 +1257,91 @@ def polar_histogram(*args, **kwargs):
             is_binlimits = False
 
         # grouping the data from given theta
+        theta = np.asarray(theta, dtype=np.float64)
         if is_binedges:
-            for x in range(len(binedges)):
-                start = binedges[x]
-                classes.append([])
-                for y in range(len(theta)):
-                    try:
-                        if start < theta[y] <= binedges[x + 1]:
-
-                            if is_binlimits:
-                                if binlimits[0] <= theta[y] <= binlimits[1]:
-                                    classes[x].append(theta[y])
-                            else:
-                                classes[x].append(theta[y])
-                    except Exception:
-                        pass
-                if len(classes[x]) == 0:
-                    classes[x].append(None)
+            if is_binlimits:
+                theta = theta[(binlimits[0] <= theta) & (theta <= binlimits[1])]
+            # bin x holds the values in (binedges[x], binedges[x + 1]]; the last
+            # edge opens a bin that has no upper edge and therefore stays empty
+            edges = np.asarray(binedges, dtype=np.float64)
+            ascending = np.all(edges[:-1] <= edges[1:])
+            if ascending and _bin_edges_numba is not None and len(theta) > _HIST_NUMBA_THRESHOLD:
+                # binned in parallel without an index array of the size of theta
+                counts = _bin_edges_numba(theta, edges, np.empty((numba.get_num_threads(), len(edges)), np.int64))
+            elif ascending:
+                # ascending edges: look up the bin of every value
+                bin_index = np.searchsorted(edges, theta, side='left') - 1
+                counts = np.bincount(bin_index[(bin_index >= 0) & (bin_index < len(edges) - 1)],
+                                     minlength=len(edges))
+            else:
+                # the bins may overlap, so they are counted by binary searches
+                # for both edges in the sorted values
+                sorted_theta = np.sort(theta)
+                counts = np.zeros(len(edges), dtype=np.int64)
+                counts[:-1] = np.maximum(np.searchsorted(sorted_theta, edges[1:], side='right') -
+                                         np.searchsorted(sorted_theta, edges[:-1], side='right'), 0)
         # no Binedges
         else:
             # Optional Bin Limits
             if is_binlimits:
-                theta = [angle for angle in theta if binlimits[0] <= angle <= binlimits[1]]
+                theta = theta[(binlimits[0] <= theta) & (theta <= binlimits[1])]
             interval = 2 * np.pi / num_bins
-            for x in range(num_bins):
-                classes.append([])
-                for y in range(len(theta)):
-                    if start <= theta[y] < (start + interval):
-                        classes[x].append(theta[y])
-
-                if is_colormap:
-                    # angles list for colormap
-                    angles.append([start, start + interval])
-                if len(classes[x]) == 0:
-                    classes[x].append(None)
-                start += interval
-
-    _plt.kwargs['classes'] = classes
+            # bin x holds the values in [edges[x], edges[x + 1]), the edges are
+            # built by repeatedly adding the interval (np.cumsum is sequential)
+            edges = np.empty(num_bins + 1)
+            edges[0] = 0
+            np.cumsum(np.full(num_bins, interval), out=edges[1:])
+            if _fast_histogram1d is not None and len(theta) > _FAST_HISTOGRAM_THRESHOLD:
+                # fast_histogram uses half-open bins as well, but does not correct
+                # values within rounding errors of an inner edge
+                counts = _fast_histogram1d(theta, bins=num_bins, range=(edges[0], edges[-1])).astype(np.int64)
+            else:
+                # the bins are uniform, so the bin index is computed directly (like
+                # np.histogram does for a given range) and only corrected by one
+                # where rounding puts a value on the wrong side of an edge
+                theta = theta[(edges[0] <= theta) & (theta < edges[-1])]
+                bin_index = (theta * (1 / interval)).astype(np.intp)
+                np.minimum(bin_index, num_bins - 1, out=bin_index)
+                bin_index -= theta < edges[bin_index]
+                bin_index += theta >= edges[bin_index + 1]
+                counts = np.bincount(bin_index, minlength=num_bins)
+            if is_colormap:
+                angles = np.stack((edges[:-1], edges[1:]), axis=1)
+
+    _plt.kwargs['temp_bin_counts'] = counts
+    empty_mask = counts == 0
+    # empty bins are counted as one when searching for the largest bin
+    lengths = np.where(empty_mask, 1, counts)
+    if normalization == 'cumcount':
+        max_length = int(lengths.sum())
+    else:
+        max_length = int(lengths.max())
 
     # calc total
-    total = 0
-    for temp in classes:
-        total += len(temp) - temp.count(None)
+    total = int(counts.sum())
 
     if is_binedges:
         if normalization == 'pdf':
             norm_factor = total
         elif normalization == 'countdensity':
             norm_factor = 1
-        binwidths = []
-
-        classes = [temp for temp in classes if len(temp) > 0]
-        for i in range(len(binedges) - 1):
-            binwidths.append(binedges[i + 1] - binedges[i])
-        binwidths.append(binedges[-1] - binedges[-2])
+        # the trailing bin past the last edge reuses the last bin width
+        binwidths = np.diff(np.asarray(binedges, np.float64))
+        binwidths = np.append(binwidths, binwidths[-1])
         if normalization == 'countdensity' or normalization == 'pdf':
-            bin_value = [len(x) / (norm_factor * binwidths[i]) for (i, x) in enumerate(classes)]
+            # also used for the radii of the colormap image
+            bin_norm = norm_factor * binwidths[:len(counts)]
+            bin_value = lengths / bin_norm
 
     exp = 0
     if normalization == 'probability' or normalization == 'pdf':
         if normalization == 'probability':
-            maximum = find_max(classes, normalization) / total
+            maximum = max_length / total
         elif normalization == 'pdf':
             if is_binedges:
-                maximum = max(bin_value)
+                maximum = float(bin_value.max())
             else:
-                maximum = find_max(classes, normalization) / (total * width)
+                maximum = max_length / (total * width)
         exp = round(np.log10(maximum) + 0.5)
         border = round((maximum * (10 ** (abs(exp) + 1))) / (10 ** (round(abs(exp) + 1))))
         while border < maximum or border * 10 ** (abs(exp) + 2) % 4 != 0:
@@ -1129,31 +1354,22 @@ def polar_histogram(*args, **kwargs):
         # interval for x-Axis
         if is_binedges:
             if normalization == 'countdensity':
-                maximum = round(max(bin_value) + 0.49)
+                maximum = round(float(bin_value.max()) + 0.49)
             else:
-                maximum = int(find_max(classes, normalization))
+                maximum = max_length
         else:
             if normalization == 'countdensity':
-                maximum = int(find_max(classes, normalization) / width)
+                maximum = int(max_length / width)
             else:
-                maximum = int(find_max(classes, normalization))
+                maximum = max_length
 
-        border = maximum
-        outer = True
-        e = 1
-
-        while True and outer:
-            if border <= 40:
-                while border % 4 != 0:
-                    border += 1
-                break
-            else:
-                for x in range(9):
-                    border += x * 10 ** (e - 1)
-                    if border % 4 == 0:
-                        outer = False
-                        break
-                e += 1
+        if maximum <= 40:
+            # round up to the next multiple of 4
+            border = -(-maximum // 4) * 4
+        else:
+            # add 0, 1, 3, 6, ... until a multiple of 4 is reached, the needed
+            # offset only depends on the remainder
+            border = maximum + (0, 3, 6, 1)[int(maximum % 4)]
 
     # calc colormap image
     if normalization == 'probability':
@@ -1186,117 +1402,58 @@ def polar_histogram(*args, **kwargs):
         else:
             r_lim = (0, 1)
 
-        height = 2000
+        height = int(_plt.kwargs.get('colormap_resolution', 2000))
+        if height <= 0:
+            raise ValueError('colormap_resolution has to be a positive integer')
         width = height
         center = width / 2
-        cumulative = []
-        length = 0
 
         max_radius = center * 0.8
         r_min = r_lim[0] * max_radius
         r_max = r_lim[1] * max_radius
         del max_radius
 
+        # image radius of a normalised bin value of 1
+        radius_scale = 0.8 * center / border
+
         if normalization == 'cumcount' or normalization == 'cdf':
-            for temp in classes:
-                if temp[0] is None:
-                    if len(cumulative) > 0:
-                        cumulative.append(cumulative[-1])
-                    else:
-                        cumulative.append(0)
-                else:
-                    length += len(temp) / norm_factor / border * 0.8 * center
-                    cumulative.append(length)
+            # empty bins add nothing, so they keep the radius of the previous bin
+            cumulative = np.cumsum(np.where(empty_mask, 0, counts * (radius_scale / norm_factor)))
 
-        factor_angle_b = len(colormap[0]) / (2 * np.pi)
-        Y, X = np.ogrid[:height, :width]
-        radiusc = np.sqrt((X - center) ** 2 + (Y - center) ** 2)
-        angle_c = np.arctan2(Y - center, X - center)
-        angle_c[angle_c < 0] += 2 * np.pi
-        angle_b = angle_c * factor_angle_b
-        factor_radiusb2 = (len(colormap) - 1) / (center * 2 ** (1 / 2))
-        radiusb2 = radiusc * factor_radiusb2
-        colormap = np.array(colormap)
-        lineardata = colormap[radiusb2.astype(np.int), angle_b.astype(np.int)].flatten()
+        colormap = np.asarray(colormap)
+
+        if is_binedges and (normalization == 'countdensity' or normalization == 'pdf'):
+            bin_value = np.where(empty_mask, 0, counts / bin_norm * radius_scale)
+        else:
+            bin_value = np.where(empty_mask, 0, counts * (radius_scale / norm_factor))
 
         if is_binedges:
-            if normalization == 'pdf':
-                norm_factor = total
-            if normalization == 'countdensity':
-                norm_factor = 1
-            binwidths = []
-            for i in range(len(classes)):
-                if len(classes[i]) < 1:
-                    classes.pop(i)
-            for i in range(len(binedges) - 1):
-                binwidths.append(binedges[i + 1] - binedges[i])
-            binwidths.append(binedges[-1] - binedges[-2])
+            angle_edges = np.asarray(binedges, dtype=np.float64)
+            angles = np.stack((angle_edges[:-1], angle_edges[1:]), axis=1)
 
-            if normalization == 'countdensity' or normalization == 'pdf':
-                bin_value = np.array(
-                    [len(x) / (norm_factor * binwidths[i]) / border * 0.8 * center if x[0] is not None else 0
-                     for (i, x) in enumerate(classes)])
-            else:
-                bin_value = np.array([len(x) / norm_factor / border * 0.8 * center if x[0] is not None else 0
-                                      for x in classes])
-        # no bin_edges
+        if normalization == 'cdf' or normalization == 'cumcount':
+            radii = cumulative
         else:
-            bin_value = np.array([len(x) / norm_factor / border * 0.8 * center if x[0] is not None else 0
-                                  for x in classes])
-
-        if not is_binedges:
-            if normalization == 'cdf' or normalization == 'cumcount':
-                boolmap = np.zeros((height, width))
-                for (angle1, angle2), radius in zip(angles, cumulative):
-                    tempmap = angle1 <= angle_c
-                    tempmap = np.logical_and(angle_c <= angle2, tempmap)
-                    tempmap = np.logical_and(radiusc <= radius, tempmap)
-                    tempmap = np.logical_and(radiusc <= r_max, tempmap)
-                    tempmap = np.logical_and(r_min <= radiusc, tempmap)
-                    boolmap = np.logical_or(tempmap, boolmap)
-
-            else:
-                boolmap = np.zeros((height, width))
-                for (angle1, angle2), radius in zip(angles, bin_value):
-                    tempmap = angle1 <= angle_c
-                    tempmap = np.logical_and(angle_c <= angle2, tempmap)
-                    tempmap = np.logical_and(radiusc <= radius, tempmap)
-                    tempmap = np.logical_and(radiusc <= r_max, tempmap)
-                    tempmap = np.logical_and(r_min <= radiusc, tempmap)
-                    boolmap = np.logical_or(tempmap, boolmap)
-
-        # Binedges
+            radii = bin_value
+
+        if _plt.kwargs.get('radial_gradient', True):
+            radiusc, angle_c, colormap_index = _polar_grid(height, width, colormap.shape[0], colormap.shape[1])
+            # gather with linear indices, this creates the flat image data directly
+            lineardata = np.take(colormap.ravel(), colormap_index)
+            boolmap = _polar_sector_mask(angle_c, radiusc, angles, radii, r_min, r_max)
+            # the mask is already boolean, so only its inverse is allocated
+            lineardata[~boolmap.ravel()] = 0
+            _plt.kwargs['temp_colormap'] = (height, width, lineardata)
         else:
-            angles = []
-            for i in range(len(binedges) - 1):
-                angles.append([])
-                angles[i].append(binedges[i])
-                angles[i].append(binedges[i + 1])
-
-            if normalization == 'cdf' or normalization == 'cumcount':
-
-                boolmap = np.zeros((height, width))
-                for (angle1, angle2), radius in zip(angles, cumulative):
-                    tempmap = angle1 <= angle_c
-                    tempmap = np.logical_and(angle_c <= angle2, tempmap)
-                    tempmap = np.logical_and(radiusc <= radius, tempmap)
-                    tempmap = np.logical_and(radiusc <= r_max, tempmap)
-                    tempmap = np.logical_and(r_min <= radiusc, tempmap)
-                    boolmap = np.logical_or(tempmap, boolmap)
-
-            else:
-
-                boolmap = np.zeros((height, width))
-                for (angle1, angle2), radius in zip(angles, bin_value):
-                    tempmap = angle1 <= angle_c
-                    tempmap = np.logical_and(angle_c <= angle2, tempmap)
-                    tempmap = np.logical_and(radiusc <= radius, tempmap)
-                    tempmap = np.logical_and(radiusc <= r_max, tempmap)
-                    tempmap = np.logical_and(r_min <= radiusc, tempmap)
-                    boolmap = np.logical_or(tempmap, boolmap)
-
-        lineardata[np.logical_not(boolmap.flatten())] = 0
-        _plt.kwargs['temp_colormap'] = (height, width, lineardata)
+            # one color per bin, taken from the colormap image at the center of the bar
+            num_colored = min(len(angles), len(radii))
+            center_angles = np.mean(np.asarray(angles[:num_colored], dtype=np.float64).reshape(num_colored, 2), axis=1)
+            center_radii = (np.clip(radii[:num_colored], r_min, r_max) + r_min) / 2
+            rows = (center_radii * ((colormap.shape[0] - 1) / (center * 2 ** (1 / 2)))).astype(np.intp)
+            columns = (np.mod(center_angles, 2 * np.pi) * (colormap.shape[1] / (2 * np.pi))).astype(np.intp)
+            bin_colors = np.zeros(len(counts), dtype=colormap.dtype)
+            bin_colors[:num_colored] = colormap[rows, np.minimum(columns, colormap.shape[1] - 1)]
+            _plt.kwargs['temp_bin_colors'] = bin_colors
 
     _plt.kwargs['border_exp'] = (border, exp)
 
@@ -1311,7 +1468,6 @@ def polar_histogram(*args, **kwargs):
     return plt
 
 
-@_close_gks_on_error
 def plot3(*args, **kwargs):
     """
     Draw one or more three-dimensional line plots.
@@ -1329,13 +1485,15 @@ def plot3(*args, **kwargs):
     >>> # Plot the points
     >>> mlab.plot3(x, y, z)
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    _plt.args = _plot_args(args, fmt='xyac')
-    return _plot_data(kind='plot3')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        plt.args = _plot_args(args, fmt='xyac')
+        return _plot_data(kind='plot3')
 
 
-@_close_gks_on_error
 def scatter3(x, y, z, c=None, *args, **kwargs):
     """
     Draw one or more three-dimensional scatter plots.
@@ -1360,16 +1518,18 @@ def scatter3(x, y, z, c=None, *args, **kwargs):
     >>> # Plot the points with colors
     >>> mlab.scatter3(x, y, z, c)
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    args = [x, y, z] + list(args)
-    if c is not None:
-        args.append(c)
-    _plt.args = _plot_args(args, fmt='xyac')
-    return _plot_data(kind='scatter3')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        args = [x, y, z] + list(args)
+        if c is not None:
+            args.append(c)
+        plt.args = _plot_args(args, fmt='xyac')
+        return _plot_data(kind='scatter3')
 
 
-@_close_gks_on_error
 def isosurface(v, **kwargs):
     """
     Draw an isosurface.
@@ -1391,13 +1551,15 @@ def isosurface(v, **kwargs):
     >>> # Draw the isosurace.
     >>> mlab.isosurface(v, isovalue=0.2)
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    _plt.args = [(None, None, v, None, '')]
-    return _plot_data(kind='isosurface')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        plt.args = [(None, None, v, None, '')]
+        return _plot_data(kind='isosurface')
 
 
-@_close_gks_on_error
 def volume(v, **kwargs):
     """
     Draw a volume.
@@ -1425,14 +1587,16 @@ def volume(v, **kwargs):
     >>> # Draw the 3d volume data using an emission model
     >>> mlab.volume(v, algorithm='emission', dmin=0.1, dmax=0.4)
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    nz, ny, nx = v.shape
-    _plt.args = [(np.arange(nx + 1), np.arange(nz + 1), np.arange(ny + 1), v, '')]
-    return _plot_data(kind='volume')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        nz, ny, nx = v.shape
+        plt.args = [(np.arange(nx + 1), np.arange(nz + 1), np.arange(ny + 1), v, '')]
+        return _plot_data(kind='volume')
 
 
-@_close_gks_on_error
 def imshow(image, **kwargs):
     """
     Draw an image.
@@ -1453,13 +1617,15 @@ def imshow(image, **kwargs):
     >>> # Draw an image from a file
     >>> mlab.imshow("example.png")
     """
-    global _plt
-    _plt.kwargs.update(kwargs)
-    _plt.args = [(None, None, image, None, "")]
-    return _plot_data(kind='imshow')
+    plt = _plt
+    kw = plt.kwargs
+    with _guard_gks:
+        if kwargs:
+            kw.update(kwargs)
+        plt.args = [(None, None, image, None, "")]
+        return _plot_data(kind='imshow')
 
 
-@_close_gks_on_error
 def size(*size):
     """
     Set the size of the output window.
@@ -1492,14 +1658,14 @@ def size(*size):
     >>> # Set the size to 0.5 feet by 0.1 meters
     >>> mlab.size(0.5, "ft", 0.1, "m")
     """
-    if len(size) == 1 and hasattr(size[0], '__getitem__'):
-        size = size[0]
-    if len(size) == 0:
-        size = (600, 450)
-    return _plot_data(size=size)
+    with _guard_gks:
+        if len(size) == 1 and hasattr(size[0], '__getitem__'):
+            size = size[0]
+        if len(size) == 0:
+            size = (600, 450)
+        return _plot_data(size=size)
 
 
-@_close_gks_on_error
 def title(title=""):
     """
     Set the plot title.
@@ -1518,10 +1684,10 @@ def title(title=""):
     >>> # Clear the plot title
     >>> mlab.title()
     """
-    return _plot_data(title=title)
+    with _guard_gks:
+        return _plot_data(title=title)
 
 
-@_close_gks_on_error
 def xlabel(x_label=""):
     """
     Set the x-axis label.
@@ -1540,10 +1706,10 @@ def xlabel(x_label=""):
     >>> # Clear the x-axis label
     >>> mlab.xlabel()
     """
-    return _plot_data(xlabel=x_label)
+    with _guard_gks:
+        return _plot_data(xlabel=x_label)
 
 
-@_close_gks_on_error
 def ylabel(y_label=""):
     r"""
     Set the y-axis label.
@@ -1562,10 +1728,10 @@ def ylabel(y_label=""):
     >>> # Clear the y-axis label
     >>> mlab.ylabel()
     """
-    return _plot_data(ylabel=y_label)
+    with _guard_gks:
+        return _plot_data(ylabel=y_label)
 
 
-@_close_gks_on_error
 def zlabel(z_label=""):
     r"""
     Set the z-axis label.
@@ -1584,10 +1750,10 @@ def zlabel(z_label=""):
     >>> # Clear the z-axis label
     >>> mlab.zlabel()
     """
-    return _plot_data(zlabel=z_label)
+    with _guard_gks:
+        return _plot_data(zlabel=z_label)
 
 
-@_close_gks_on_error
 def dlabel(d_label=""):
     r"""
     Set the volume intensity label.
@@ -1606,10 +1772,10 @@ def dlabel(d_label=""):
     >>> # Clear the volume intensity label
     >>> mlab.dlabel()
     """
-    return _plot_data(dlabel=d_label)
+    with _guard_gks:
+        return _plot_data(dlabel=d_label)
 
 
-@_close_gks_on_error
 def xlim(x_min=None, x_max=None, adjust=True):
     """
     Set the limits for the x-axis.
@@ -1642,15 +1808,15 @@ def xlim(x_min=None, x_max=None, adjust=True):
     >>> # Reset the x-axis lower limit and set the upper limit to 1
     >>> mlab.xlim(None, 1)
     """
-    if x_max is None and x_min is not None:
-        try:
-            x_min, x_max = x_min
-        except TypeError:
-            pass
-    return _plot_data(xlim=(x_min, x_max), adjust_xlim=adjust)
+    with _guard_gks:
+        if x_max is None and x_min is not None:
+            try:
+                x_min, x_max = x_min
+            except TypeError:
+                pass
+        return _plot_data(xlim=(x_min, x_max), adjust_xlim=adjust)
 
 
-@_close_gks_on_error
 def ylim(y_min=None, y_max=None, adjust=True):
     """
     Set the limits for the y-axis.
@@ -1683,15 +1849,15 @@ def ylim(y_min=None, y_max=None, adjust=True):
     >>> # Reset the y-axis lower limit and set the upper limit to 1
     >>> mlab.ylim(None, 1)
     """
-    if y_max is None and y_min is not None:
-        try:
-            y_min, y_max = y_min
-        except TypeError:
-            pass
-    return _plot_data(ylim=(y_min, y_max), adjust_ylim=adjust)
+    with _guard_gks:
+        if y_max is None and y_min is not None:
+            try:
+                y_min, y_max = y_min
+            except TypeError:
+                pass
+        return _plot_data(ylim=(y_min, y_max), adjust_ylim=adjust)
 
 
-@_close_gks_on_error
 def zlim(z_min=None, z_max=None, adjust=True):
     """
     Set the limits for the z-axis.
@@ -1724,15 +1890,15 @@ def zlim(z_min=None, z_max=None, adjust=True):
     >>> # Reset the z-axis lower limit and set the upper limit to 1
     >>> mlab.zlim(None, 1)
     """
-    if z_max is None and z_min is not None:
-        try:
-            z_min, z_max = z_min
-        except TypeError:
-            pass
-    return _plot_data(zlim=(z_min, z_max), adjust_zlim=adjust)
+    with _guard_gks:
+        if z_max is None and z_min is not None:
+            try:
+                z_min, z_max = z_min
+            except TypeError:
+                pass
+        return _plot_data(zlim=(z_min, z_max), adjust_zlim=adjust)
 
 
-@_close_gks_on_error
 def rlim(r_min=None, r_max=None, adjust=True):
     """
     Set the limits for the radii in polar plots.
@@ -1765,15 +1931,15 @@ def rlim(r_min=None, r_max=None, adjust=True):
     >>> # Reset the inner radius and set the outer radius to 1
     >>> mlab.rlim(None, 1)
     """
-    if r_max is None and r_min is not None:
-        try:
-            r_min, r_max = r_min
-        except TypeError:
-            pass
-    return _plot_data(rlim=(r_min, r_max), adjust_rlim=adjust)
+    with _guard_gks:
+        if r_max is None and r_min is not None:
+            try:
+                r_min, r_max = r_min
+            except TypeError:
+                pass
+        return _plot_data(rlim=(r_min, r_max), adjust_rlim=adjust)
 
 
-@_close_gks_on_error
 def philim(phi_min=None, phi_max=None, adjust=True):
     """
     Set the start and end angle for polar plots in radians.
@@ -1806,15 +1972,15 @@ def philim(phi_min=None, phi_max=None, adjust=True):
     >>> # Reset the start angle and set end angle to 2 Pi
     >>> mlab.philim(None, 2*np.pi)
     """
-    if phi_max is None and phi_min is not None:
-        try:
-            phi_min, phi_max = phi_min
-        except TypeError:
-            pass
-    return _plot_data(philim=(phi_min, phi_max), adjust_philim=adjust)
+    with _guard_gks:
+        if phi_max is None and phi_min is not None:
+            try:
+                phi_min, phi_max = phi_min
+            except TypeError:
+                pass
+        return _plot_data(philim=(phi_min, phi_max), adjust_philim=adjust)
 
 
-@_close_gks_on_error
 def xlog(xlog=True):
     """
     Enable or disable a logarithmic scale for the x-axis.
@@ -1828,10 +1994,10 @@ def xlog(xlog=True):
     >>> # Disable it again
     >>> mlab.xlog(False)
     """
-    return _plot_data(xlog=xlog)
+    with _guard_gks:
+        return _plot_data(xlog=xlog)
 
 
-@_close_gks_on_error
 def ylog(ylog=True):
     """
     Enable or disable a logarithmic scale for the y-axis.
@@ -1845,10 +2011,10 @@ def ylog(ylog=True):
     >>> # Disable it again
     >>> mlab.ylog(False)
     """
-    return _plot_data(ylog=ylog)
+    with _guard_gks:
+        return _plot_data(ylog=ylog)
 
 
-@_close_gks_on_error
 def zlog(zlog=True):
     """
     Enable or disable a logarithmic scale for the z-axis.
@@ -1862,10 +2028,10 @@ def zlog(zlog=True):
     >>> # Disable it again
     >>> mlab.zlog(False)
     """
-    return _plot_data(zlog=zlog)
+    with _guard_gks:
+        return _plot_data(zlog=zlog)
 
 
-@_close_gks_on_error
 def xflip(xflip=True):
     """
     Enable or disable x-axis flipping/reversal.
@@ -1879,10 +2045,10 @@ def xflip(xflip=True):
     >>> # Restores the x-axis
     >>> mlab.xflip(False)
     """
-    return _plot_data(xflip=xflip)
+    with _guard_gks:
+        return _plot_data(xflip=xflip)
 
 
-@_close_gks_on_error
 def yflip(yflip=True):
     """
     Enable or disable y-axis flipping/reversal.
@@ -1896,10 +2062,10 @@ def yflip(yflip=True):
     >>> # Restores the y-axis
     >>> mlab.yflip(False)
     """
-    return _plot_data(yflip=yflip)
+    with _guard_gks:
+        return _plot_data(yflip=yflip)
 
 
-@_close_gks_on_error
 def zflip(zflip=True):
     """
     Enable or disable z-axis flipping/reversal.
@@ -1913,10 +2079,10 @@ def zflip(zflip=True):
     >>> # Restores the z-axis
     >>> mlab.zflip(False)
     """
-    return _plot_data(zflip=zflip)
+    with _guard_gks:
+        return _plot_data(zflip=zflip)
 
 
-@_close_gks_on_error
 def rflip(rflip=True):
     """
     Enable or disable flipping/reversal of the radius.
@@ -1930,10 +2096,10 @@ def rflip(rflip=True):
     >>> # Restores the radius
     >>> mlab.rflip(False)
     """
-    return _plot_data(rflip=rflip)
+    with _guard_gks:
+        return _plot_data(rflip=rflip)
 
 
-@_close_gks_on_error
 def phiflip(phiflip=True):
     """
     Enable or disable flipping/reversal of the polar angles.
@@ -1947,10 +2113,10 @@ def phiflip(phiflip=True):
     >>> # Restores the angles
     >>> mlab.phiflip(False)
     """
-    return _plot_data(phiflip=phiflip)
+    with _guard_gks:
+        return _plot_data(phiflip=phiflip)
 
 
-@_close_gks_on_error
 def colormap(colormap=''):
     """
     Get or set the colormap for the current plot or enable manual colormap control.
@@ -1983,13 +2149,13 @@ def colormap(colormap=''):
     >>> # Get the current colormap as list of red-green-blue tuples
     >>> colormap = mlab.colormap()
     """
-    if colormap == '':
-        _set_colormap()
-        return [(c[0], c[1], c[2]) for c in _colormap()]
-    return _plot_data(colormap=colormap)
+    with _guard_gks:
+        if colormap == '':
+            _set_colormap()
+            return list(_colormap_tuples())
+        return _plot_data(colormap=colormap)
 
 
-@_close_gks_on_error
 def field_of_view(field_of_view):
     """
     Set the vertical field of view of the current 3D plot.
@@ -2021,10 +2187,10 @@ def field_of_view(field_of_view):
     >>> mlab.field_of_view(None)
     >>> mlab.plot3(x, y, z)
     """
-    return _plot_data(field_of_view=field_of_view)
+    with _guard_gks:
+        return _plot_data(field_of_view=field_of_view)
 
 
-@_close_gks_on_error
 def tilt(tilt):
     """
     Set the 3d axis tilt of the current plot.
@@ -2049,10 +2215,10 @@ def tilt(tilt):
     >>> mlab.tilt(45)
     >>> mlab.plot3(x, y, z)
     """
-    return _plot_data(tilt=tilt)
+    with _guard_gks:
+        return _plot_data(tilt=tilt)
 
 
-@_close_gks_on_error
 def rotation(rotation):
     """
     Set the 3d axis rotation of the current plot.
@@ -2079,10 +2245,10 @@ def rotation(rotation):
     >>> mlab.rotation(45)
     >>> mlab.plot3(x, y, z)
     """
-    return _plot_data(rotation=rotation)
+    with _guard_gks:
+        return _plot_data(rotation=rotation)
 
 
-@_close_gks_on_error
 def legend(*labels, **kwargs):
     r"""
     Set the labels and location for the legend of the current plot.
@@ -2104,12 +2270,12 @@ def legend(*labels, **kwargs):
     >>> # Resets the legend
     >>> mlab.legend()
     """
-    if not all(isinstance(label, basestring) for label in labels):
-        raise TypeError('list of strings expected')
-    return _plot_data(labels=labels, **kwargs)
+    with _guard_gks:
+        if not all(isinstance(label, basestring) for label in labels):
+            raise TypeError('list of strings expected')
+        return _plot_data(labels=labels, **kwargs)
 
 
-@_close_gks_on_error
 def savefig(filename):
     """
     Save the current figure to a file.
@@ -2128,12 +2294,18 @@ def savefig(filename):
     >>> # Save the figure to a file
     >>> mlab.savefig("example.png")
     """
-    gr.beginprint(filename)
-    _plot_data()
-    gr.endprint()
+    global _dspsize
+    with _guard_gks:
+        # the display size depends on the output device
+        _dspsize = None
+        gr.beginprint(filename)
+        try:
+            _plot_data()
+        finally:
+            _dspsize = None
+        gr.endprint()
 
 
-@_close_gks_on_error
 def figure(**kwargs):
     """
     Create a new figure with the given settings.
@@ -2150,13 +2322,35 @@ def figure(**kwargs):
     >>> # Restore all default settings and set the title
     >>> mlab.figure(title="Example Figure")
     """
-    global _plt
-    _plt = _Figure()
-    _plt.kwargs.update(kwargs)
-    return _plt
+    global _plt, _dspsize
+    with _guard_gks:
+        _plt = _Figure()
+        if kwargs:
+            _plt.kwargs.update(kwargs)
+        _plot_args_cache_clear()
+        _text_width_cache.clear()
+        _dspsize = None
+        return _plt
+
+
+def refresh_display_metrics():
+    """
+    Query the display size again before the next plot is drawn.
+
+    The display size is only queried once per figure. Call this function if
+    the plot window has been moved to a display with a different size or
+    resolution without creating a new figure.
+
+    **Usage examples:**
+
+    >>> # Draw the next plot with the size of the current display
+    >>> mlab.refresh_display_metrics()
+    >>> mlab.plot(range(100), lambda x: 1/(x+1))
+    """
+    global _dspsize
+    _dspsize = None
 
 
-@_close_gks_on_error
 def hold(flag):
     """
     Set the hold flag for combining multiple plots.
@@ -2181,11 +2375,11 @@ def hold(flag):
     >>> mlab.hold(False)
     """
     global _plt
-    _plt.kwargs['ax'] = flag
-    _plt.kwargs['clear'] = not flag
+    with _guard_gks:
+        _plt.kwargs['ax'] = flag
+        _plt.kwargs['clear'] = not flag
 
 
-@_close_gks_on_error
 def subplot(num_rows, num_columns, subplot_indices):
     """
     Set current subplot index.
@@ -2214,20 +2408,20 @@ def subplot(num_rows, num_columns, subplot_indices):
     >>> mlab.subplot(1, 1, 1)
     """
     global _plt
-    x_min = y_min = 1
-    x_max = y_max = 0
-    if isinstance(subplot_indices, int):
-        subplot_indices = (subplot_indices,)
-    for subplot_index in subplot_indices:
-        row = num_rows - (subplot_index - 1.0) // num_columns
-        column = (subplot_index - 1.0) % num_columns + 1
-        x_min = min(x_min, (column - 1) / num_columns)
-        x_max = max(x_max, column / num_columns)
-        y_min = min(y_min, (row - 1) / num_rows)
-        y_max = max(y_max, row / num_rows)
-    _plt.kwargs['subplot'] = [x_min, x_max, y_min, y_max]
-    _plt.kwargs['clear'] = (subplot_indices[0] == 1)
-    _plt.kwargs['update'] = (subplot_indices[-1] == num_rows * num_columns)
+    with _guard_gks:
+        if isinstance(subplot_indices, int):
+            subplot_indices = (subplot_indices,)
+        # rows are counted from the bottom, so the first index is in the top row
+        top_row = num_rows - (min(subplot_indices) - 1.0) // num_columns
+        bottom_row = num_rows - (max(subplot_indices) - 1.0) // num_columns
+        columns = [(subplot_index - 1.0) % num_columns for subplot_index in subplot_indices]
+        x_min = min(1, min(columns) / num_columns)
+        x_max = max(0, (max(columns) + 1) / num_columns)
+        y_min = min(1, (bottom_row - 1) / num_rows)
+        y_max = max(0, top_row / num_rows)
+        _plt.kwargs['subplot'] = [x_min, x_max, y_min, y_max]
+        _plt.kwargs['clear'] = (subplot_indices[0] == 1)
+        _plt.kwargs['update'] = (subplot_indices[-1] == num_rows * num_columns)
 
 
 class _Figure(object):
@@ -2244,6 +2438,22 @@ class _Figure(object):
 
 _plt = _Figure()
 
+# plot kinds that are drawn in a three-dimensional coordinate system
+_3D_KINDS = frozenset(('wireframe', 'surface', 'plot3', 'scatter3', 'trisurf', 'volume'))
+# plot kinds that draw their own colorbar
+_COLORBAR_KINDS = frozenset(('quiver', 'hexbin', 'contour', 'contourf', 'surface', 'trisurf', 'heatmap', 'volume',
+                             'polar_heatmap'))
+
+# figure settings and the gr scale options they enable
+_SCALE_OPTIONS = (
+    ('xlog', gr.OPTION_X_LOG),
+    ('ylog', gr.OPTION_Y_LOG),
+    ('zlog', gr.OPTION_Z_LOG),
+    ('xflip', gr.OPTION_FLIP_X),
+    ('yflip', gr.OPTION_FLIP_Y),
+    ('zflip', gr.OPTION_FLIP_Z),
+)
+
 
 _gr3_available = None
 
@@ -2251,6 +2461,10 @@ _gr3_available = None
 def _gr3_is_available():
     global _gr3_available
     if _gr3_available is None:
+        # GR_NO_GR3 skips the initialization attempt where GR3 is known to be unusable
+        if os.environ.get('GR_NO_GR3', ''):
+            _gr3_available = False
+            return _gr3_available
         try:
             gr3.init()
         except gr3.GR3_Exception:
@@ -2260,112 +2474,219 @@ def _gr3_is_available():
     return _gr3_available
 
 
+# colormap last set by mlab, or None if the colors may have been set by gr.setcolorrep
+_colormap_key = None
+# packed colors of the last colormaps read by _packed_colormap, keyed by _colormap_key
+_colormap_cache = _LRUCache(4)
+
+
+def _setcolormap(colormap):
+    global _colormap_key
+    gr.setcolormap(colormap)
+    _colormap_key = colormap
+
+
+def _setcolormapfromrgb(colors, positions):
+    global _colormap_key
+    gr.setcolormapfromrgb(colors, positions)
+    try:
+        _colormap_key = (tuple(tuple(color) for color in colors), tuple(positions) if positions is not None else None)
+        hash(_colormap_key)
+    except TypeError:
+        _colormap_key = None
+
+
+def _packed_colormap():
+    """
+    Return the current colormap as 256 colors packed like gr.inqcolor, with red in the lowest byte.
+    """
+    key = _colormap_key
+    colors = _colormap_cache.get(key) if key is not None else None
+    if colors is None:
+        colors = np.fromiter((gr.inqcolor(1000 + color_index) for color_index in range(256)), np.int64, 256)
+        if key is None:
+            return colors
+        # the table is shared by all callers with the same colormap
+        colors.flags.writeable = False
+        _colormap_cache.put(key, colors)
+    return colors
+
+
+# red-green-blue tuples of the last colormap returned by colormap(), with its _colormap_key
+_colormap_tuples_cache = (None, None)
+
+
+def _colormap_tuples():
+    global _colormap_tuples_cache
+    key, tuples = _colormap_tuples_cache
+    if key is None or key != _colormap_key:
+        inv = 1 / 255.0
+        tuples = tuple(((c & 0xff) * inv, ((c >> 8) & 0xff) * inv, ((c >> 16) & 0xff) * inv)
+                       for c in _packed_colormap().tolist())
+        _colormap_tuples_cache = (_colormap_key, tuples)
+    return tuples
+
+
+# opaque heatmap colors with the packed colormap they were built from
+_heatmap_colormap_cache = (None, None)
+
+
+def _heatmap_colormap():
+    """
+    Return the current colormap as opaque colors packed with red in the lowest byte, as used by gr.drawimage.
+    """
+    global _heatmap_colormap_cache
+    colors = _packed_colormap()
+    cached_colors, icmap = _heatmap_colormap_cache
+    # cached colormaps are returned as the same read-only array until they change
+    if cached_colors is not colors:
+        icmap = ((colors & 0xffffff) | (255 << 24)).astype(np.uint32)
+        icmap.flags.writeable = False
+        _heatmap_colormap_cache = (colors, icmap)
+    return icmap
+
+
 def _colormap():
+    colors = _packed_colormap()
     rgba = np.ones((256, 4), np.float32)
-    for color_index in range(256):
-        color = gr.inqcolor(1000 + color_index)
-        rgba[color_index, 0] = (color % 256) / 255.0
-        rgba[color_index, 1] = ((color >> 8) % 256) / 255.0
-        rgba[color_index, 2] = ((color >> 16) % 256) / 255.0
+    rgba[:, 0] = (colors % 256) / 255.0
+    rgba[:, 1] = ((colors >> 8) % 256) / 255.0
+    rgba[:, 2] = ((colors >> 16) % 256) / 255.0
     return rgba
 
 
 def _set_colormap():
-    global _plt
+    global _plt, _colormap_key
     if 'cmap' in _plt.kwargs:
         warnings.warn('The parameter "cmap" has been replaced by "colormap". The value of "cmap" will be ignored.', stacklevel=3)
     colormap = _plt.kwargs.get('colormap', gr.COLORMAP_VIRIDIS)
     if colormap is None:
+        _colormap_key = None
         return
     if isinstance(colormap, int):
-        gr.setcolormap(colormap)
+        _setcolormap(colormap)
         return
     if hasattr(colormap, 'upper'):
         colormap_name = 'COLORMAP_' + colormap.upper()
         colormap = getattr(gr, colormap_name)
-        gr.setcolormap(colormap)
+        _setcolormap(colormap)
         return
-    if isinstance(colormap, dict):
-        positions, colors = zip(*sorted(list(colormap.items())))
     if isinstance(colormap, tuple):
-
         if isinstance(colormap[0], int):
-            gr.setcolormap(colormap[0])
+            _setcolormap(colormap[0])
         elif isinstance(colormap[1], int):
-            gr.setcolormap(colormap[1])
+            _setcolormap(colormap[1])
         else:
-            gr.setcolormap(1)
+            _setcolormap(1)
         return
+    if isinstance(colormap, dict):
+        positions, colors = zip(*sorted(colormap.items()))
     else:
         positions = None
         colors = colormap
-    gr.setcolormapfromrgb(colors, positions)
+    _setcolormapfromrgb(colors, positions)
+
+
+# pixel sizes of the last interpreted figure sizes, keyed by size, dpi and default size
+_interpret_size_cache = _LRUCache(32)
 
 
 def _interpret_size(size, dpi, default_size=(600, 450)):
-    units = {
-        'px': (1, 0),
-        'in': (0, 1),
-        '"': (0, 1),
-        'ft': (0, 12),
-        '\'': (0, 12),
-        'mm': (0, 0.1 / 2.54),
-        'cm': (0, 1 / 2.54),
-        'dm': (0, 10 / 2.54),
-        'm': (0, 100 / 2.54)
-    }
-
-    def pixels_per_unit(unit, dpi):
-        return units[unit][0] + units[unit][1] * dpi
-
-    def interpret_length(length, dpi, default_length):
-        if length is None:
-            return default_length
-        if is_floatish(length):
-            return float(length)
-        if hasattr(length, 'endswith'):
-            for unit in units:
-                if length.endswith(unit) and is_floatish(length[:-len(unit)]):
-                    length_value = float(length[:-len(unit)])
-                    return length_value * pixels_per_unit(unit, dpi)
-        print("Unable to interpret length '{}', falling back to default value: {} pixels".format(length, default_length), file=sys.stderr)
+    try:
+        key = (tuple(size), dpi, tuple(default_size))
+        result = _interpret_size_cache.get(key)
+    except TypeError:
+        # sizes with unhashable elements are not cached
+        return _interpret_size_uncached(size, dpi, default_size)
+    if result is None:
+        result = _interpret_size_uncached(size, dpi, default_size)
+        _interpret_size_cache.put(key, result)
+    return result
+
+
+# length units with their size in pixels and in inches
+_SIZE_UNITS = {
+    'px': (1, 0),
+    'in': (0, 1),
+    '"': (0, 1),
+    'ft': (0, 12),
+    '\'': (0, 12),
+    'mm': (0, 0.1 / 2.54),
+    'cm': (0, 1 / 2.54),
+    'dm': (0, 10 / 2.54),
+    'm': (0, 100 / 2.54)
+}
+# splits a length like '6.5cm' into its value and unit, preferring the longest unit
+_LENGTH_UNIT_RE = re.compile(r'(.*?)(' + '|'.join(re.escape(unit) for unit in sorted(_SIZE_UNITS, key=len, reverse=True)) +
+                             r')\Z', re.DOTALL)
+
+
+def _pixels_per_unit(unit, dpi):
+    return _SIZE_UNITS[unit][0] + _SIZE_UNITS[unit][1] * dpi
+
+
+def _interpret_length(length, dpi, default_length):
+    if length is None:
         return default_length
+    if _is_floatish(length):
+        return float(length)
+    if isinstance(length, basestring):
+        match = _LENGTH_UNIT_RE.match(length)
+        if match is not None and _is_floatish(match.group(1)):
+            return float(match.group(1)) * _pixels_per_unit(match.group(2), dpi)
+    print("Unable to interpret length '{}', falling back to default value: {} pixels".format(length, default_length), file=sys.stderr)
+    return default_length
 
-    def is_floatish(number):
-        try:
-            float(number)
-            return True
-        except ValueError:
-            return False
-        except TypeError:
-            return False
 
+def _is_floatish(number):
+    try:
+        float(number)
+        return True
+    except ValueError:
+        return False
+    except TypeError:
+        return False
+
+
+def _interpret_size_uncached(size, dpi, default_size):
     if len(size) == 2:
-        width = interpret_length(size[0], dpi, default_size[0])
-        height = interpret_length(size[1], dpi, default_size[1])
+        width = _interpret_length(size[0], dpi, default_size[0])
+        height = _interpret_length(size[1], dpi, default_size[1])
         return width, height
-    if len(size) == 3 and is_floatish(size[0]) and is_floatish(size[1]) and size[2] in units:
+    if len(size) == 3 and _is_floatish(size[0]) and _is_floatish(size[1]) and size[2] in _SIZE_UNITS:
         width_value = float(size[0])
         height_value = float(size[1])
         unit = size[2]
-        width = width_value * pixels_per_unit(unit, dpi)
-        height = height_value * pixels_per_unit(unit, dpi)
+        width = width_value * _pixels_per_unit(unit, dpi)
+        height = height_value * _pixels_per_unit(unit, dpi)
         return width, height
-    if len(size) == 4 and is_floatish(size[0]) and size[1] in units and is_floatish(size[2]) and size[3] in units:
+    if len(size) == 4 and _is_floatish(size[0]) and size[1] in _SIZE_UNITS and _is_floatish(size[2]) and size[3] in _SIZE_UNITS:
         width_value = float(size[0])
         unit = size[1]
-        width = width_value * pixels_per_unit(unit, dpi)
+        width = width_value * _pixels_per_unit(unit, dpi)
         height_value = float(size[2])
         unit = size[3]
-        height = height_value * pixels_per_unit(unit, dpi)
+        height = height_value * _pixels_per_unit(unit, dpi)
         return width, height
     print("Unable to interpret size '{}', falling back to default size: {} x {} pixels".format(repr(size), default_size[0], default_size[1]), file=sys.stderr)
     return default_size
 
 
+# display size reported by gr.inqdspsize, kept until the next figure, savefig or
+# refresh_display_metrics
+_dspsize = None
+
+
+def _inqdspsize():
+    global _dspsize
+    if _dspsize is None:
+        _dspsize = gr.inqdspsize()
+    return _dspsize
+
+
 def _set_viewport(kind, subplot):
     global _plt
-    metric_width, metric_height, pixel_width, pixel_height = gr.inqdspsize()
+    metric_width, metric_height, pixel_width, pixel_height = _inqdspsize()
     if 'figsize' in _plt.kwargs:
         horizontal_pixels_per_inch = pixel_width * 0.0254 / metric_width
         vertical_pixels_per_inch = pixel_height * 0.0254 / metric_height
@@ -2392,7 +2713,7 @@ def _set_viewport(kind, subplot):
         vp[0] *= aspect_ratio
         vp[1] *= aspect_ratio
 
-    if kind in ('wireframe', 'surface', 'plot3', 'scatter3', 'trisurf', 'volume'):
+    if kind in _3D_KINDS:
         if kind in ('surface', 'trisurf', 'volume'):
             extent = min(vp[1] - vp[0] - 0.1, vp[3] - vp[2])
         else:
@@ -2413,7 +2734,15 @@ def _set_viewport(kind, subplot):
     colorbar = _plt.kwargs.get('colorbar', None)
     if colorbar or kind in ('contour', 'contourf', 'heatmap', 'polar_heatmap', 'hexbin', 'quiver'):
         viewport[1] -= 0.1
-    gr.setviewport(*viewport)
+    if kind == 'polar':
+        # polar plots are drawn in the largest centered square of the viewport
+        x_min, x_max, y_min, y_max = viewport
+        x_center = 0.5 * (x_min + x_max)
+        y_center = 0.5 * (y_min + y_max)
+        r = 0.5 * min(x_max - x_min, y_max - y_min)
+        gr.setviewport(x_center - r, x_center + r, y_center - r, y_center + r)
+    else:
+        gr.setviewport(*viewport)
     _plt.kwargs['viewport'] = viewport
     _plt.kwargs['vp'] = vp
     _plt.kwargs['ratio'] = aspect_ratio
@@ -2432,13 +2761,6 @@ def _set_viewport(kind, subplot):
         gr.selntran(1)
         gr.restorestate()
 
-    if kind == 'polar':
-        x_min, x_max, y_min, y_max = viewport
-        x_center = 0.5 * (x_min + x_max)
-        y_center = 0.5 * (y_min + y_max)
-        r = 0.5 * min(x_max - x_min, y_max - y_min)
-        gr.setviewport(x_center - r, x_center + r, y_center - r, y_center + r)
-
 
 def _fix_minmax(v_min, v_max):
     if v_min == v_max:
@@ -2451,53 +2773,147 @@ def _fix_minmax(v_min, v_max):
     return v_min, v_max
 
 
-def _minmax(kind=None):
-    global _plt
+# extrema of read-only arrays, keyed by id and validated with a weak reference
+_array_extrema_cache = _LRUCache(16)
+
+
+def _nanminmax(a):
+    """
+    Return np.nanmin(a) and np.nanmax(a). The result is cached for read-only arrays which own their data, as these
+    are not modified in place between frames.
+    """
+    cacheable = isinstance(a, np.ndarray) and a.base is None and not a.flags.writeable
+    if cacheable:
+        entry = _array_extrema_cache.get(id(a))
+        if entry is not None and entry[0]() is a:
+            return entry[1]
+    extrema = np.nanmin(a), np.nanmax(a)
+    if cacheable:
+        _array_extrema_cache.put(id(a), (weakref.ref(a), extrema))
+    return extrema
+
+
+def _frozen_array(a):
+    """
+    Return whether a is an array whose values cannot change, as it is a view of (or itself) a read-only array which
+    owns its data.
+    """
+    if not isinstance(a, np.ndarray) or a.flags.writeable:
+        return False
+    while isinstance(a.base, np.ndarray):
+        a = a.base
+    return a.base is None and not a.flags.writeable
+
+
+# data extrema of the last plot series, reused by redraws which only change settings
+_data_extrema_cache = None
+
+
+def _data_extrema(kind):
+    global _data_extrema_cache
+    series = tuple(_plt.args)
+    # writeable arrays may have been modified in place since the last redraw
+    frozen = all(_frozen_array(v) for x, y, z, c, spec in series for v in (x, y, z, c) if v is not None)
+    if _data_extrema_cache is not None and frozen:
+        cached_series, cached_kind, extrema = _data_extrema_cache
+        # the series tuples are created anew whenever the plot data is set
+        if cached_kind == kind and len(cached_series) == len(series) and \
+                all(cached is current for cached, current in zip(cached_series, series)):
+            return extrema
+
     x_min = y_min = z_min = float('infinity')
     x_max = y_max = z_max = float('-infinity')
     x_step = y_step = float('-infinity')
 
-    for x, y, z, c, spec in _plt.args:
-        if x is None and kind in ('heatmap',):
+    # the series are split into their fields, so that each field is reduced in its own loop
+    xs = [x for x, y, z, c, spec in series]
+    ys = [y for x, y, z, c, spec in series]
+    zs = [z for x, y, z, c, spec in series]
+
+    for x, z in zip(xs, zs):
+        if x is None and kind == 'heatmap':
             x_min = -0.5
             x_max = z.shape[1] - 0.5
-        elif x is None and kind in ('polar_heatmap',):
+        elif x is None and kind == 'polar_heatmap':
             x_min = 0
             x_max = z.shape[0]
         else:
-            x_min = min(np.nanmin(x), x_min)
-            x_max = max(np.nanmax(x), x_max)
-        if y is None and kind in ('heatmap',):
+            low, high = _nanminmax(x)
+            x_min = min(low, x_min)
+            x_max = max(high, x_max)
+    for y, z in zip(ys, zs):
+        if y is None and kind == 'heatmap':
             y_min = -0.5
             y_max = z.shape[0] - 0.5
-        elif y is None and kind in ('polar_heatmap',):
+        elif y is None and kind == 'polar_heatmap':
             y_min = 0
             y_max = z.shape[1]
         else:
-            y_min = min(np.nanmin(y), y_min)
-            y_max = max(np.nanmax(y), y_max)
-        if z is not None and kind not in ('bar', ):
-            z_min = min(np.nanmin(z), z_min)
-            z_max = max(np.nanmax(z), z_max)
-        if kind in ('quiver',):
+            low, high = _nanminmax(y)
+            y_min = min(low, y_min)
+            y_max = max(high, y_max)
+    if kind != 'bar':
+        for z in zs:
+            if z is not None:
+                low, high = _nanminmax(z)
+                z_min = min(low, z_min)
+                z_max = max(high, z_max)
+    if kind == 'quiver':
+        for x in xs:
             if len(x) > 1:
                 x_step = max(np.abs(x[1:] - x[:-1]).max(), x_step)
+        for y in ys:
             if len(y) > 1:
                 y_step = max(np.abs(y[1:] - y[:-1]).max(), y_step)
 
-    if kind in ('quiver',):
+    if kind == 'quiver':
+        # Use vector length for colormap
+        x, y, u, v, spec = series[0]
+        if _squared_length_range_numba is not None and np.size(u) > _HIST_NUMBA_THRESHOLD and \
+                np.shape(u) == np.shape(v):
+            chunk_range = np.empty((numba.get_num_threads(), 2))
+            chunk_range = _squared_length_range_numba(np.ravel(u), np.ravel(v), chunk_range)
+            # NaN lengths are propagated like in np.min and np.max
+            z_min = np.sqrt(np.min(chunk_range[:, 0]))
+            z_max = np.sqrt(np.max(chunk_range[:, 1]))
+        else:
+            lengths_squared = u**2 + v**2
+            z_min = np.sqrt(np.min(lengths_squared))
+            z_max = np.sqrt(np.max(lengths_squared))
+
+    extrema = (x_min, x_max, y_min, y_max, z_min, z_max, x_step, y_step)
+    _data_extrema_cache = (series, kind, extrema) if frozen else None
+    return extrema
+
+
+# settings which override the data limits
+_LIMIT_SETTINGS = ('xlim', 'ylim', 'zlim', 'rlim', 'philim')
+# ranges of the last _minmax call with the data extrema and limit settings they were computed from
+_minmax_cache = None
+
+
+def _minmax(kind=None):
+    global _plt, _minmax_cache
+    extrema = _data_extrema(kind)
+    # the settings are compared by identity, any newly set limit computes the ranges again
+    limits = tuple(_plt.kwargs.get(key) for key in _LIMIT_SETTINGS)
+    if _minmax_cache is not None:
+        cached_extrema, cached_limits, ranges = _minmax_cache
+        if cached_extrema is extrema and all(cached is current for cached, current in zip(cached_limits, limits)):
+            _plt.kwargs['xrange'], _plt.kwargs['yrange'], _plt.kwargs['zrange'], \
+                _plt.kwargs['rrange'], _plt.kwargs['phirange'] = ranges
+            return
+
+    x_min, x_max, y_min, y_max, z_min, z_max, x_step, y_step = extrema
+
+    if kind == 'quiver':
         if x_step is not None and x_step > 0:
             x_min -= x_step
             x_max += x_step
         if y_step is not None and y_step > 0:
             y_min -= y_step
             y_max += y_step
-        # Use vector length for colormap
-        x, y, u, v, spec = _plt.args[0]
-        lengths_squared = u**2 + v**2
-        z_min = np.sqrt(np.min(lengths_squared))
-        z_max = np.sqrt(np.max(lengths_squared))
-    if kind in ('bar'):
+    if kind == 'bar':
         x_min -= 1
         x_max += 1
     else:
@@ -2541,18 +2957,43 @@ def _minmax(kind=None):
     _plt.kwargs['zrange'] = z_range
     _plt.kwargs['rrange'] = r_range
     _plt.kwargs['phirange'] = phi_range
+    _minmax_cache = (extrema, limits, (x_range, y_range, z_range, r_range, phi_range))
+
+
+# results of gr.adjustlimits, keyed by the limits passed in
+_adjustlimits_cache = _LRUCache(128)
+
+
+def _adjustlimits(a_min, a_max):
+    key = (a_min, a_max)
+    result = _adjustlimits_cache.get(key)
+    if result is None:
+        result = tuple(gr.adjustlimits(a_min, a_max))
+        _adjustlimits_cache.put(key, result)
+    return list(result)
+
+
+# results of gr.tick, keyed by the limits passed in
+_tick_cache = _LRUCache(256)
+
+
+def _tick(a_min, a_max):
+    key = (a_min, a_max)
+    result = _tick_cache.get(key)
+    if result is None:
+        result = gr.tick(a_min, a_max)
+        _tick_cache.put(key, result)
+    return result
 
 
 def _set_window(kind):
     global _plt
     scale = 0
     if kind != 'polar':
-        scale |= gr.OPTION_X_LOG if _plt.kwargs.get('xlog', False) else 0
-        scale |= gr.OPTION_Y_LOG if _plt.kwargs.get('ylog', False) else 0
-        scale |= gr.OPTION_Z_LOG if _plt.kwargs.get('zlog', False) else 0
-        scale |= gr.OPTION_FLIP_X if _plt.kwargs.get('xflip', False) else 0
-        scale |= gr.OPTION_FLIP_Y if _plt.kwargs.get('yflip', False) else 0
-        scale |= gr.OPTION_FLIP_Z if _plt.kwargs.get('zflip', False) else 0
+        kwargs = _plt.kwargs
+        for key, option in _SCALE_OPTIONS:
+            if kwargs.get(key, False):
+                scale |= option
 
     _minmax(kind)
     if kind in ('wireframe', 'surface', 'plot3', 'scatter3', 'polar', 'trisurf', 'volume'):
@@ -2562,9 +3003,9 @@ def _set_window(kind):
 
     x_min, x_max = _plt.kwargs['xrange']
     if not scale & gr.OPTION_X_LOG:
-        if _plt.kwargs.get('adjust_xlim', 'xlim' not in _plt.kwargs) and kind not in ('heatmap',):
-            x_min, x_max = gr.adjustlimits(x_min, x_max)
-        if kind in ('bar'):
+        if _plt.kwargs.get('adjust_xlim', 'xlim' not in _plt.kwargs) and kind != 'heatmap':
+            x_min, x_max = _adjustlimits(x_min, x_max)
+        if kind == 'bar':
             x_tick = 1
             if 'xnotations' in _plt.kwargs:
                 x_major_count = 0
@@ -2572,7 +3013,7 @@ def _set_window(kind):
                 x_major_count = 1
         else:
             x_major_count = major_count
-            x_tick = gr.tick(x_min, x_max) / x_major_count
+            x_tick = _tick(x_min, x_max) / x_major_count
     else:
         x_tick = x_major_count = 1
     if not scale & gr.OPTION_FLIP_X:
@@ -2588,10 +3029,10 @@ def _set_window(kind):
         else:
             y_min = 0
     if not scale & gr.OPTION_Y_LOG:
-        if _plt.kwargs.get('adjust_ylim', 'ylim' not in _plt.kwargs) and kind not in ('heatmap',):
-            y_min, y_max = gr.adjustlimits(y_min, y_max)
+        if _plt.kwargs.get('adjust_ylim', 'ylim' not in _plt.kwargs) and kind != 'heatmap':
+            y_min, y_max = _adjustlimits(y_min, y_max)
         y_major_count = major_count
-        y_tick = gr.tick(y_min, y_max) / y_major_count
+        y_tick = _tick(y_min, y_max) / y_major_count
     else:
         y_tick = y_major_count = 1
     if not scale & gr.OPTION_FLIP_Y:
@@ -2605,21 +3046,15 @@ def _set_window(kind):
         phi_min, phi_max = _phase_wrapped_philim(adjust=_plt.kwargs.get('adjust_philim', True))
         r_min, r_max = _plt.kwargs['rrange']
         if _plt.kwargs.get('adjust_rlim', True):
-            r_min, r_max = gr.adjustlimits(r_min, r_max)
+            r_min, r_max = _adjustlimits(r_min, r_max)
         r_rrel_min = r_min / r_max
-        angles = [a for a in (0, 90, 180, 270, 360) if phi_min < a < phi_max] + [phi_min, phi_max]
-        bbox = [1, -1, 1, -1]
-        for angle in angles:
-            sinf = np.sin(np.radians(angle))
-            cosf = np.cos(np.radians(angle))
-            min_x = min(cosf * 1.12, r_rrel_min * cosf)
-            max_x = max(cosf * 1.12, r_rrel_min * cosf)
-            min_y = min(sinf * 1.12, r_rrel_min * sinf)
-            max_y = max(sinf * 1.12, r_rrel_min * sinf)
-            bbox[0] = min(bbox[0], min_x)
-            bbox[1] = max(bbox[1], max_x)
-            bbox[2] = min(bbox[2], min_y)
-            bbox[3] = max(bbox[3], max_y)
+        angles = np.radians([a for a in (0, 90, 180, 270, 360) if phi_min < a < phi_max] + [phi_min, phi_max])
+        sinf = np.sin(angles)
+        cosf = np.cos(angles)
+        # outer and inner points of the axes at these angles; an undefined inner radius is ignored
+        x = np.concatenate((cosf * 1.12, r_rrel_min * cosf))
+        y = np.concatenate((sinf * 1.12, r_rrel_min * sinf))
+        bbox = [min(1, np.nanmin(x)), max(-1, np.nanmax(x)), min(1, np.nanmin(y)), max(-1, np.nanmax(y))]
         viewport = _plt.kwargs['viewport']
         vp = _plt.kwargs['vp']
         viewport_aspect = (viewport[1] - viewport[0]) / (viewport[3] - viewport[2])
@@ -2640,13 +3075,13 @@ def _set_window(kind):
     else:
         gr.setwindow(x_min, x_max, y_min, y_max)
 
-    if kind in ('wireframe', 'surface', 'plot3', 'scatter3', 'trisurf', 'volume'):
+    if kind in _3D_KINDS:
         z_min, z_max = _plt.kwargs['zrange']
         if not scale & gr.OPTION_Z_LOG:
             if _plt.kwargs.get('adjust_zlim', 'zlim' not in _plt.kwargs):
-                z_min, z_max = gr.adjustlimits(z_min, z_max)
+                z_min, z_max = _adjustlimits(z_min, z_max)
             z_major_count = major_count
-            z_tick = gr.tick(z_min, z_max) / z_major_count
+            z_tick = _tick(z_min, z_max) / z_major_count
         else:
             z_tick = z_major_count = 1
         if not scale & gr.OPTION_FLIP_Z:
@@ -2677,14 +3112,14 @@ def _phase_wrapped_philim(phirange=None, adjust=False):
         phi_min, phi_max = phirange
     if phi_min == 0 and phi_max == 360:
         return phi_min, phi_max
-    phi_min -= np.floor(phi_min / 360.) * 360
-    phi_max -= np.floor(phi_max / 360.) * 360
+    phi_min -= math.floor(phi_min / 360.) * 360.
+    phi_max -= math.floor(phi_max / 360.) * 360.
     if abs(phi_min - phi_max) < 1e-6:
         phi_max += 360
     if phi_min > phi_max:
         phi_max, phi_min = phi_min, phi_max
     if adjust:
-        phi_min, phi_max = gr.adjustlimits(phi_min / 3., phi_max / 3.)
+        phi_min, phi_max = _adjustlimits(phi_min / 3., phi_max / 3.)
         phi_min *= 3
         phi_max *= 3
     if phi_max > 360:
@@ -2694,6 +3129,27 @@ def _phase_wrapped_philim(phirange=None, adjust=False):
     return phi_min, phi_max
 
 
+# origin indices (x, y, z) of the x/z and the y grid3d calls for each quadrant of the rotation,
+# a z index of None selects the origin facing the viewer for the current tilt
+_GRID3D_ORIGINS = (
+    ((0, 1, None), (0, 1, None)),
+    ((1, 1, None), (1, 1, None)),
+    ((1, 0, None), (1, 0, None)),
+    ((0, 0, 0), (0, 0, None)),
+)
+# axes (x, y, z), origin indices (x, y) and tick direction of the two axes3d calls for each quadrant of the rotation
+_AXES3D_LAYOUTS = (
+    ((True, False, True, 0, 0, -1), (False, True, False, 1, 0, 1)),
+    ((False, False, True, 0, 1, -1), (True, True, False, 0, 0, -1)),
+    ((True, False, True, 1, 1, 1), (False, True, False, 0, 0, -1)),
+    ((False, False, True, 1, 0, -1), (True, True, False, 1, 1, 1)),
+)
+
+
+def _viewport_diagonal(viewport):
+    return ((viewport[1] - viewport[0])**2 + (viewport[3] - viewport[2])**2)**0.5
+
+
 def _draw_axes(kind, pass_=1):
     global _plt
     viewport = _plt.kwargs['viewport']
@@ -2709,11 +3165,11 @@ def _draw_axes(kind, pass_=1):
 
     gr.setlinecolorind(1)
     gr.setlinewidth(1)
-    diag = ((viewport[1] - viewport[0])**2 + (viewport[3] - viewport[2])**2)**0.5
+    diag = _viewport_diagonal(viewport)
     charheight = max(0.018 * diag, 0.012)
     gr.setcharheight(charheight)
     ticksize = 0.0075 * diag
-    if kind in ('wireframe', 'surface', 'plot3', 'scatter3', 'trisurf', 'volume'):
+    if kind in _3D_KINDS:
         z_tick, z_org, z_major_count = _plt.kwargs['zaxis']
         fov = _plt.kwargs.get('field_of_view', None)
         if fov is None:
@@ -2730,36 +3186,21 @@ def _draw_axes(kind, pass_=1):
             tilt %= 180
             tilt = min(max(tilt, 0), 180)
             zi = 0 if 0 <= tilt <= 90 else 1
+            quadrant = int(rotation // 90)
             if pass_ == 1:
-                if 0 <= rotation < 90:
-                    gr.grid3d(x_tick, 0, z_tick, x_org[0], y_org[1], z_org[zi], 2, 0, 2)
-                    gr.grid3d(0, y_tick, 0, x_org[0], y_org[1], z_org[zi], 0, 2, 0)
-                elif 90 <= rotation < 180:
-                    gr.grid3d(x_tick, 0, z_tick, x_org[1], y_org[1], z_org[zi], 2, 0, 2)
-                    gr.grid3d(0, y_tick, 0, x_org[1], y_org[1], z_org[zi], 0, 2, 0)
-                elif 180 <= rotation < 270:
-                    gr.grid3d(x_tick, 0, z_tick, x_org[1], y_org[0], z_org[zi], 2, 0, 2)
-                    gr.grid3d(0, y_tick, 0, x_org[1], y_org[0], z_org[zi], 0, 2, 0)
-                else:
-                    gr.grid3d(x_tick, 0, z_tick, x_org[0], y_org[0], z_org[0], 2, 0, 2)
-                    gr.grid3d(0, y_tick, 0, x_org[0], y_org[0], z_org[zi], 0, 2, 0)
+                (x1, y1, z1), (x2, y2, z2) = _GRID3D_ORIGINS[quadrant]
+                gr.grid3d(x_tick, 0, z_tick, x_org[x1], y_org[y1], z_org[zi if z1 is None else z1], 2, 0, 2)
+                gr.grid3d(0, y_tick, 0, x_org[x2], y_org[y2], z_org[zi if z2 is None else z2], 0, 2, 0)
             else:
-                if 0 <= rotation < 90:
-                    gr.axes3d(x_tick, 0, z_tick, x_org[0], y_org[0], z_org[zi], x_major_count, 0, z_major_count, -ticksize)
-                    gr.axes3d(0, y_tick, 0, x_org[1], y_org[0], z_org[zi], 0, y_major_count, 0, ticksize)
-                elif 90 <= rotation < 180:
-                    gr.axes3d(0, 0, z_tick, x_org[0], y_org[1], z_org[zi], 0, 0, z_major_count, -ticksize)
-                    gr.axes3d(x_tick, y_tick, 0, x_org[0], y_org[0], z_org[zi], x_major_count, y_major_count, 0, -ticksize)
-                elif 180 <= rotation < 270:
-                    gr.axes3d(x_tick, 0, z_tick, x_org[1], y_org[1], z_org[zi], x_major_count, 0, z_major_count, ticksize)
-                    gr.axes3d(0, y_tick, 0, x_org[0], y_org[0], z_org[zi], 0, y_major_count, 0, -ticksize)
-                else:
-                    gr.axes3d(0, 0, z_tick, x_org[1], y_org[0], z_org[zi], 0, 0, z_major_count, -ticksize)
-                    gr.axes3d(x_tick, y_tick, 0, x_org[1], y_org[1], z_org[zi], x_major_count, y_major_count, 0, ticksize)
+                for x_axis, y_axis, z_axis, xi, yi, sign in _AXES3D_LAYOUTS[quadrant]:
+                    gr.axes3d(x_tick if x_axis else 0, y_tick if y_axis else 0, z_tick if z_axis else 0,
+                              x_org[xi], y_org[yi], z_org[zi],
+                              x_major_count if x_axis else 0, y_major_count if y_axis else 0,
+                              z_major_count if z_axis else 0, sign * ticksize)
     else:
         if kind in ('heatmap', 'shade'):
             ticksize = -ticksize
-        if kind not in ('shade',):
+        if kind != 'shade':
             gr.grid(x_tick, y_tick, 0, 0, x_major_count, y_major_count)
         gr.axes(x_tick, y_tick, x_org[0], y_org[0], x_major_count, y_major_count, ticksize)
         gr.axes(x_tick, y_tick, x_org[1], y_org[1], -x_major_count, -y_major_count, -ticksize)
@@ -2770,25 +3211,25 @@ def _draw_axes(kind, pass_=1):
         gr.textext(0.5 * (viewport[0] + viewport[1]), vp[3], _plt.kwargs['title'])
         gr.restorestate()
 
-    if kind in ('wireframe', 'surface', 'plot3', 'scatter3', 'trisurf', 'volume'):
+    if kind in _3D_KINDS:
         x_label = _plt.kwargs.get('xlabel', '')
         y_label = _plt.kwargs.get('ylabel', '')
         z_label = _plt.kwargs.get('zlabel', '')
         gr.titles3d(x_label, y_label, z_label)
     else:
-        if 'xlabel' in _plt.kwargs:
-            gr.savestate()
-            gr.settextalign(gr.TEXT_HALIGN_CENTER, gr.TEXT_VALIGN_BOTTOM)
-            gr.textext(0.5 * (viewport[0] + viewport[1]), vp[2] + 0.5 * charheight, _plt.kwargs['xlabel'])
-            gr.restorestate()
-        if 'ylabel' in _plt.kwargs:
+        if 'xlabel' in _plt.kwargs or 'ylabel' in _plt.kwargs:
+            # both labels set their own text alignment, so they can share one saved state
             gr.savestate()
-            gr.settextalign(gr.TEXT_HALIGN_CENTER, gr.TEXT_VALIGN_TOP)
-            gr.setcharup(-1, 0)
-            gr.textext(vp[0] + 0.5 * charheight, 0.5 * (viewport[2] + viewport[3]), _plt.kwargs['ylabel'])
+            if 'xlabel' in _plt.kwargs:
+                gr.settextalign(gr.TEXT_HALIGN_CENTER, gr.TEXT_VALIGN_BOTTOM)
+                gr.textext(0.5 * (viewport[0] + viewport[1]), vp[2] + 0.5 * charheight, _plt.kwargs['xlabel'])
+            if 'ylabel' in _plt.kwargs:
+                gr.settextalign(gr.TEXT_HALIGN_CENTER, gr.TEXT_VALIGN_TOP)
+                gr.setcharup(-1, 0)
+                gr.textext(vp[0] + 0.5 * charheight, 0.5 * (viewport[2] + viewport[3]), _plt.kwargs['ylabel'])
             gr.restorestate()
 
-    if kind in ('bar'):
+    if kind == 'bar':
         if 'xnotations' in _plt.kwargs:
             x_notations = _plt.kwargs.pop('xnotations')
             yval = _plt.args[0][2] if _plt.kwargs['multi_bar'] else _plt.args[0][1]
@@ -2807,45 +3248,48 @@ def _draw_axes(kind, pass_=1):
 def _draw_polar_axes():
     global _plt
     viewport = _plt.kwargs['viewport']
-    diag = ((viewport[1] - viewport[0])**2 + (viewport[3] - viewport[2])**2)**0.5
+    diag = _viewport_diagonal(viewport)
     charheight = max(0.018 * diag, 0.012)
 
     r_min, r_max = _plt.kwargs['rrange']
     if _plt.kwargs.get('adjust_rlim', True):
-        r_min, r_max = gr.adjustlimits(r_min, r_max)
+        r_min, r_max = _adjustlimits(r_min, r_max)
 
     phi_min, phi_max = _phase_wrapped_philim(adjust=_plt.kwargs.get('adjust_philim', True))
 
     gr.savestate()
     gr.setcharheight(charheight)
     gr.setlinetype(gr.LINETYPE_SOLID)
-    tick = gr.tick(phi_min / 6., phi_max / 6.) * 1.5
+    tick = _tick(phi_min / 6., phi_max / 6.) * 1.5
     n = int(round((phi_max - phi_min) / tick + 0.5))
+    angle_labels = phi_min + np.arange(n + 1) * tick
+    if _plt.kwargs.get('phiflip', False):
+        angles = phi_max - np.arange(n + 1) * tick
+    else:
+        angles = angle_labels
+    # spokes outside of the angle range are drawn at its boundary
+    radians = np.radians(np.clip(angles, phi_min, phi_max))
+    cos_angles = np.cos(radians)
+    sin_angles = np.sin(radians)
+    pline = np.array([r_min / r_max, 1])
     for i in range(n + 1):
-        angle_label = phi_min + i * tick
-        if _plt.kwargs.get('phiflip', False):
-            angle = phi_max - i * tick
-        else:
-            angle = angle_label
-        sinf = np.sin(np.radians(angle))
-        cosf = np.cos(np.radians(angle))
-        pline = np.array([r_min / r_max, 1])
-        if phi_min <= angle <= phi_max:
+        cosf = cos_angles[i]
+        sinf = sin_angles[i]
+        if phi_min <= angles[i] <= phi_max:
             if i % 2 == 0 and not (i == n and phi_max % 360 == phi_min % 360):
                 gr.setlinecolorind(88)
                 gr.settextalign(gr.TEXT_HALIGN_CENTER, gr.TEXT_VALIGN_HALF)
                 x, y = gr.wctondc(1.1 * cosf, 1.1 * sinf)
-                gr.textext(x, y, "%g\xb0" % angle_label)
+                gr.textext(x, y, "%g\xb0" % angle_labels[i])
             else:
                 gr.setlinecolorind(90)
         else:
-            angle = np.clip(angle, phi_min, phi_max)
             gr.setlinecolorind(88)
-            sinf = np.sin(np.radians(angle))
-            cosf = np.cos(np.radians(angle))
         gr.polyline(cosf * pline, sinf * pline)
-    tick = 0.5 * gr.tick(r_min, r_max)
+    tick = 0.5 * _tick(r_min, r_max)
     n = int(round((r_max - r_min) / tick + 0.5))
+    sinf = np.sin(np.radians(phi_min))
+    cosf = np.cos(np.radians(phi_min))
     for i in range(n + 1):
         r = (r_min + i * tick) / r_max
         gr.setlinecolorind(88)
@@ -2855,8 +3299,6 @@ def _draw_polar_axes():
         gr.drawarc(-r, r, -r, r, phi_min, phi_max)
         if i % 2 == 0 and not r > 1:
             gr.settextalign(gr.TEXT_HALIGN_CENTER, gr.TEXT_VALIGN_HALF)
-            sinf = np.sin(np.radians(phi_min))
-            cosf = np.cos(np.radians(phi_min))
             x, y = gr.wctondc(r * cosf + sinf * 0.05, r * sinf - cosf * 0.05)
             if _plt.kwargs.get('rflip', False):
                 r_label = r_max - i * tick
@@ -2867,6 +3309,20 @@ def _draw_polar_axes():
     gr.restorestate()
 
 
+# widths of legend labels, keyed by label and the character height set by _draw_axes, cleared by figure()
+_text_width_cache = _LRUCache(64)
+
+
+def _text_width(label, charheight):
+    key = (label, charheight)
+    width = _text_width_cache.get(key)
+    if width is None:
+        tbx, tby = gr.inqtextext(0, 0, label)
+        width = tbx[2]
+        _text_width_cache.put(key, width)
+    return width
+
+
 def _draw_legend():
     global _plt
     viewport = _plt.kwargs['viewport']
@@ -2875,10 +3331,10 @@ def _draw_legend():
     gr.savestate()
     gr.selntran(0)
     gr.setscale(0)
+    charheight = max(0.018 * _viewport_diagonal(viewport), 0.012)
     w = 0
     for label in _plt.kwargs['labels']:
-        tbx, tby = gr.inqtextext(0, 0, label)
-        w = max(w, tbx[2])
+        w = max(w, _text_width(label, charheight))
 
     num_lines = len(_plt.args)
     h = (num_lines + 1) * 0.03
@@ -2933,9 +3389,9 @@ def _colorbar(off=0.0, colors=256, label_name='zlabel'):
     gr.setwindow(0, 1, 0, 1)
 
     if colors == 1:
-        data = [1000]
+        data = np.array([1000], np.int32)
     else:
-        data = [1000 + int(255 * i / (colors - 1)) for i in range(colors)]
+        data = (1000 + 255 * np.arange(colors) // (colors - 1)).astype(np.int32)
 
     gr.setlinecolorind(1)
     gr.setscale(0)
@@ -2943,7 +3399,7 @@ def _colorbar(off=0.0, colors=256, label_name='zlabel'):
         gr.cellarray(0, 1, 0, 1, 1, colors, data)
     else:
         gr.cellarray(0, 1, 1, 0, 1, colors, data)
-    diag = ((viewport[1] - viewport[0]) ** 2 + (viewport[3] - viewport[2]) ** 2) ** 0.5
+    diag = _viewport_diagonal(viewport)
     charheight = max(0.016 * diag, 0.012)
     gr.setcharheight(charheight)
 
@@ -2959,7 +3415,7 @@ def _colorbar(off=0.0, colors=256, label_name='zlabel'):
             gr.setscale(gr.OPTION_FLIP_Y)
         else:
             gr.setscale(0)
-        ztick = 0.5 * gr.tick(zmin, zmax)
+        ztick = 0.5 * _tick(zmin, zmax)
         gr.setwindow(0, 1, zmin, zmax)
         gr.axes(0, ztick, 1, zmin, 0, 1, 0.005)
     else:
@@ -2980,7 +3436,6 @@ def _colorbar(off=0.0, colors=256, label_name='zlabel'):
 
     label = _plt.kwargs.get(label_name, None)
     if label:
-        diag = ((viewport[1] - viewport[0])**2 + (viewport[3] - viewport[2])**2)**0.5
         charheight = max(0.018 * diag, 0.012)
         gr.setcharheight(charheight)
         gr.settextalign(gr.TEXT_HALIGN_CENTER, gr.TEXT_VALIGN_BASE)
@@ -2988,6 +3443,40 @@ def _colorbar(off=0.0, colors=256, label_name='zlabel'):
     gr.restorestate()
 
 
+def _marker_runs(*keys):
+    """
+    Return the start and end indices of the runs of consecutive points which share their values in all keys.
+    """
+    changes = np.zeros(len(keys[0]), bool)
+    for key in keys:
+        changes[1:] |= key[1:] != key[:-1]
+    starts = np.concatenate(([0], np.flatnonzero(changes)))
+    ends = np.append(starts[1:], len(changes))
+    return zip(starts, ends)
+
+
+def _marker_color_indices(c, n):
+    """
+    Return the colormap indices of the first n color values, scaled to the range of all color values.
+    """
+    c_min = c.min()
+    c_ptp = c.max() - c_min
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scaled = 255 * (c[:n] - c_min) / c_ptp
+    if not np.all(np.isfinite(scaled)):
+        raise ValueError('cannot convert the color values to colormap indices')
+    return 1000 + scaled.astype(int)
+
+
+def _contour_levels(z_min, z_max, num_levels, log=False):
+    """
+    Return num_levels evenly spaced contour levels, starting at z_min and ending below z_max.
+    """
+    if log:
+        return np.exp(np.linspace(np.log(z_min), np.log(z_max), num_levels, endpoint=False))
+    return np.linspace(z_min, z_max, num_levels, endpoint=False)
+
+
 def _plot_data(**kwargs):
     global _plt
     _plt.kwargs.update(kwargs)
@@ -3013,7 +3502,7 @@ def _plot_data(**kwargs):
         _set_window(kind)
 
     _set_colormap()
-    if colorbar and kind not in ('quiver', 'hexbin', 'contour', 'contourf', 'surface', 'trisurf', 'heatmap', 'volume' 'polar_heatmap'):
+    if colorbar and kind not in _COLORBAR_KINDS:
         _colorbar()
     gr.uselinespec(" ")
     for x, y, z, c, spec in _plt.args:
@@ -3031,51 +3520,30 @@ def _plot_data(**kwargs):
             if mask in (0, 1, 3, 4, 5):
                 where = _plt.kwargs.get('step_where', 'mid')
                 if where == 'pre':
-                    n = len(x)
-                    x_step_boundaries = np.zeros(2 * n - 1)
-                    y_step_values = np.zeros(2 * n - 1)
-                    x_step_boundaries[0] = x[0]
-                    x_step_boundaries[1::2] = x[:-1]
-                    x_step_boundaries[2::2] = x[1:]
-                    y_step_values[0] = y[0]
-                    y_step_values[1::2] = y[1:]
-                    y_step_values[2::2] = y[1:]
+                    x_step_boundaries = np.repeat(x, 2)[:-1]
+                    y_step_values = np.repeat(y, 2)[1:]
                 elif where == 'post':
-                    n = len(x)
-                    x_step_boundaries = np.zeros(2 * n - 1)
-                    y_step_values = np.zeros(2 * n - 1)
-                    x_step_boundaries[0::2] = x
-                    x_step_boundaries[1::2] = x[1:]
-                    x_step_boundaries[-1] = x[-1]
-                    y_step_values[0::2] = y
-                    y_step_values[1::2] = y[:-1]
-                    y_step_values[-1] = y[-1]
+                    x_step_boundaries = np.repeat(x, 2)[1:]
+                    y_step_values = np.repeat(y, 2)[:-1]
                 else:
-                    n = len(x)
-                    x_step_boundaries = np.zeros(2 * n)
-                    x_step_boundaries[0] = x[0]
-                    x_step_boundaries[1:-1][0::2] = (x[1:] + x[:-1]) / 2
-                    x_step_boundaries[1:-1][1::2] = (x[1:] + x[:-1]) / 2
-                    x_step_boundaries[-1] = x[-1]
-                    y_step_values = np.zeros(2 * n)
-                    y_step_values[0::2] = y
-                    y_step_values[1::2] = y
+                    x_step_boundaries = np.concatenate((x[:1], np.repeat((x[1:] + x[:-1]) / 2, 2), x[-1:]))
+                    y_step_values = np.repeat(y, 2)
                 gr.polyline(x_step_boundaries, y_step_values)
             if mask & 2:
                 gr.polymarker(x, y)
         elif kind == 'scatter':
             gr.setmarkertype(gr.MARKERTYPE_SOLID_CIRCLE)
             if z is not None or c is not None:
-                if c is not None:
-                    c_min = c.min()
-                    c_ptp = c.ptp()
-                for i in range(len(x)):
-                    if z is not None:
-                        gr.setmarkersize(z[i] / 100.0)
-                    if c is not None:
-                        c_index = 1000 + int(255 * (c[i] - c_min) / c_ptp)
-                        gr.setmarkercolorind(c_index)
-                    gr.polymarker([x[i]], [y[i]])
+                n = len(x)
+                sizes = z[:n] / 100.0 if z is not None else None
+                c_indices = _marker_color_indices(c, n) if c is not None else None
+                # consecutive points with the same marker size and color are drawn together, keeping the drawing order
+                for start, end in _marker_runs(*[key for key in (sizes, c_indices) if key is not None]):
+                    if sizes is not None:
+                        gr.setmarkersize(sizes[start])
+                    if c_indices is not None:
+                        gr.setmarkercolorind(int(c_indices[start]))
+                    gr.polymarker(x[start:end], y[start:end])
             else:
                 gr.polymarker(x, y)
         elif kind == 'bar':
@@ -3098,12 +3566,14 @@ def _plot_data(**kwargs):
             gr.polymarker(x, y)
         elif kind == 'hist':
             y_min = _plt.kwargs['window'][2]
+            # all bars are filled first, so that no outline is partially covered by a neighbouring bar
+            gr.setfillcolorind(989)
+            gr.setfillintstyle(gr.INTSTYLE_SOLID)
             for i in range(1, len(y) + 1):
-                gr.setfillcolorind(989)
-                gr.setfillintstyle(gr.INTSTYLE_SOLID)
                 gr.fillrect(x[i - 1], x[i], y_min, y[i - 1])
-                gr.setfillcolorind(1)
-                gr.setfillintstyle(gr.INTSTYLE_HOLLOW)
+            gr.setfillcolorind(1)
+            gr.setfillintstyle(gr.INTSTYLE_HOLLOW)
+            for i in range(1, len(y) + 1):
                 gr.fillrect(x[i - 1], x[i], y_min, y[i - 1])
         elif kind == 'contour':
             z_min, z_max = _plt.kwargs['zrange']
@@ -3111,15 +3581,12 @@ def _plot_data(**kwargs):
             num_levels = _plt.kwargs.get('levels', 20)
             if x.shape == y.shape == z.shape:
                 x, y, z = gr.gridit(x, y, z, 200, 200)
-                z = np.array(z)
+                z = np.asarray(z)
                 z_min, z_max = _plt.kwargs.get('zlim', (np.min(z), np.max(z)))
             else:
                 z = np.ascontiguousarray(z)
-            if _plt.kwargs['scale'] & gr.OPTION_Z_LOG:
-                h = [np.exp(np.log(z_min) + i / num_levels * (np.log(z_max) - np.log(z_min))) for i in range(num_levels)]
-            else:
-                h = [z_min + i / num_levels * (z_max - z_min) for i in range(num_levels)]
-            z.shape = np.prod(z.shape)
+            h = _contour_levels(z_min, z_max, num_levels, _plt.kwargs['scale'] & gr.OPTION_Z_LOG)
+            z = z.ravel()
             gr.contour(x, y, h, z, 1000)
             if colorbar or colorbar is None:
                 _colorbar(colors=num_levels)
@@ -3131,15 +3598,12 @@ def _plot_data(**kwargs):
             gr.setscale(scale)
             if x.shape == y.shape == z.shape:
                 x, y, z = gr.gridit(x, y, z, 200, 200)
-                z = np.array(z)
+                z = np.asarray(z)
                 z_min, z_max = _plt.kwargs.get('zlim', (np.min(z), np.max(z)))
             else:
                 z = np.ascontiguousarray(z)
-            if _plt.kwargs['scale'] & gr.OPTION_Z_LOG:
-                h = [np.exp(np.log(z_min) + i / num_levels * (np.log(z_max) - np.log(z_min))) for i in range(num_levels)]
-            else:
-                h = [z_min + i / num_levels * (z_max - z_min) for i in range(num_levels)]
-            z.shape = np.prod(z.shape)
+            h = _contour_levels(z_min, z_max, num_levels, _plt.kwargs['scale'] & gr.OPTION_Z_LOG)
+            z = z.ravel()
             if colorbar or colorbar is None:
                 _colorbar(colors=num_levels)
             gr.setlinecolorind(1)
@@ -3158,11 +3622,7 @@ def _plot_data(**kwargs):
             if y is not None:
                 y_min, y_max = y
             height, width = z.shape
-            cmap = _colormap()
-            icmap = np.zeros(256, np.uint32)
-            for i in range(256):
-                r, g, b, a = cmap[i]
-                icmap[i] = (int(r * 255) << 0) + (int(g * 255) << 8) + (int(b * 255) << 16) + (int(a * 255) << 24)
+            icmap = _heatmap_colormap()
             z_min, z_max = _plt.kwargs.get('zlim', (np.min(z), np.max(z)))
             if z_max < z_min:
                 z_max, z_min = z_min, z_max
@@ -3174,14 +3634,13 @@ def _plot_data(**kwargs):
                 data = (z - z_min) / (z_max - z_min) * 255
             else:
                 data = np.zeros((height, width))
-            rgba = np.zeros((height, width), np.uint32)
-            for x in range(width):
-                for y in range(height):
-                    if 0 <= data[y, x] <= 255:
-                        rgba[y, x] = icmap[int(data[y, x])]
-                    else:
-                        # make invalid values transparent
-                        rgba[y, x] = 0
+            if _heatmap_colors_numba is not None and data.size > _HIST_NUMBA_THRESHOLD:
+                rgba = _heatmap_colors_numba(data, icmap, np.empty((height, width), np.uint32))
+            else:
+                valid = (data >= 0) & (data <= 255)
+                rgba = icmap[np.where(valid, data, 0).astype(np.intp)]
+                # make invalid values transparent
+                rgba[~valid] = 0
             y_min, y_max = y_max, y_min
             gr.drawimage(x_min, x_max, y_min, y_max, width, height, rgba)
             if colorbar or colorbar is None:
@@ -3196,9 +3655,13 @@ def _plot_data(**kwargs):
                 z_min = np.log(z_min)
                 z_max = np.log(z_max)
             if z_max > z_min:
-                data = (1000 + (z - z_min) / (z_max - z_min) * 255).astype(np.int)
+                # scale in place, keeping the order of operations so that no color index changes
+                data = np.true_divide(z - z_min, z_max - z_min)
+                data *= 255
+                data += 1000
+                data = data.astype(np.int32)
             else:
-                data = np.zeros((height, width), dtype=np.int)
+                data = np.zeros((height, width), dtype=np.int32)
             if y is not None:
                 phi_range = np.degrees(y)
             else:
@@ -3209,9 +3672,9 @@ def _plot_data(**kwargs):
                 phi_offset = phi_max_adj + phi_min_adj - phi_max - phi_min
                 phi_min, phi_max = phi_max + phi_offset, phi_min + phi_offset
             if x is not None:
-                r_range = np.array(x)
+                r_range = np.asarray(x)
             else:
-                r_range = np.array(_plt.kwargs['rrange'])
+                r_range = np.asarray(_plt.kwargs['rrange'])
             r_min, r_max = _plt.kwargs['rrange']
             relative_r_min = r_min / r_max
             r_range = ((r_range - r_min) / (r_max - r_min) * (1 - relative_r_min)) + relative_r_min
@@ -3224,20 +3687,20 @@ def _plot_data(**kwargs):
         elif kind == 'wireframe':
             if x.shape == y.shape == z.shape:
                 x, y, z = gr.gridit(x, y, z, 50, 50)
-                z = np.array(z)
+                z = np.asarray(z)
             else:
                 z = np.ascontiguousarray(z)
-            z.shape = np.prod(z.shape)
+            z = z.ravel()
             gr.setfillcolorind(0)
             gr.surface(x, y, z, gr.OPTION_FILLED_MESH)
             _draw_axes(kind, 2)
         elif kind == 'surface':
             if x.shape == y.shape == z.shape:
                 x, y, z = gr.gridit(x, y, z, 200, 200)
-                z = np.array(z)
+                z = np.asarray(z)
             else:
                 z = np.ascontiguousarray(z)
-            z.shape = np.prod(z.shape)
+            z = z.ravel()
             if _plt.kwargs.get('accelerate', True) and _gr3_is_available():
                 gr3.clear()
                 gr3.surface(x, y, z, gr.OPTION_COLORED_MESH)
@@ -3252,12 +3715,10 @@ def _plot_data(**kwargs):
         elif kind == 'scatter3':
             gr.setmarkertype(gr.MARKERTYPE_SOLID_CIRCLE)
             if c is not None:
-                c_min = c.min()
-                c_ptp = c.ptp()
-                for i in range(len(x)):
-                    c_index = 1000 + int(255 * (c[i] - c_min) / c_ptp)
-                    gr.setmarkercolorind(c_index)
-                    gr.polymarker3d([x[i]], [y[i]], [z[i]])
+                c_indices = _marker_color_indices(c, len(x))
+                for start, end in _marker_runs(c_indices):
+                    gr.setmarkercolorind(int(c_indices[start]))
+                    gr.polymarker3d(x[start:end], y[start:end], z[start:end])
             else:
                 gr.polymarker3d(x, y, z)
             _draw_axes(kind, 2)
@@ -3304,7 +3765,9 @@ def _plot_data(**kwargs):
             gr.tricontour(x, y, z, levels)
         elif kind == 'shade':
             xform = _plt.kwargs.get('xform', 5)
-            if np.any(np.isnan(x)):
+            # NaN values separate the polylines; the minimum propagates them, so
+            # no boolean mask of the size of x has to be created to find them
+            if len(x) > 0 and np.isnan(np.min(x)):
                 gr.shadelines(x, y, xform=xform)
             else:
                 gr.shadepoints(x, y, xform=xform)
@@ -3326,9 +3789,16 @@ def _plot_img(image):
         if width == 0 or height == 0:
             return
     else:
-        image = np.array(image)
+        image = np.asarray(image)
         height, width = image.shape
-        data = np.array(1000 + (1.0 * image - image.min()) / image.ptp() * 255, np.int32)
+        image_min = image.min()
+        image_ptp = image.max() - image_min
+        # scale in place, keeping the order of operations so that no color index changes
+        data = 1.0 * image - image_min
+        data /= image_ptp
+        data *= 255
+        data += 1000
+        data = data.astype(np.int32)
 
     if _plt.kwargs['clear']:
         gr.clearws()
@@ -3401,8 +3871,25 @@ def _plot_iso(v):
     else:
         isovalue = _plt.kwargs.get('isovalue', 0.5)
         isovalue = int((isovalue - v_min) / (v_max - v_min) * uint16_max)
-    v = (np.clip(v, v_min, v_max) - v_min) / (v_max - v_min) * uint16_max
-    values = v.astype(np.uint16)
+    table_dtype = None
+    if v.dtype.kind in 'iu' and v.dtype.itemsize <= 2 and v.size > 1 << (8 * v.dtype.itemsize):
+        # small integer volumes: every possible value is scaled once and the volume is looked up in that table,
+        # which is indexed by the raw bytes of the values
+        table_dtype = np.dtype('u{}'.format(v.dtype.itemsize))
+        scaled = np.arange(1 << (8 * v.dtype.itemsize)).astype(table_dtype).view(v.dtype)
+    else:
+        scaled = v
+    # scale in place on the clipped copy instead of allocating a temporary per operation
+    scaled = np.clip(scaled, v_min, v_max)
+    scaled -= v_min
+    if np.issubdtype(scaled.dtype, np.floating):
+        scaled /= v_max - v_min
+    else:
+        scaled = scaled / (v_max - v_min)
+    scaled *= uint16_max
+    values = scaled.astype(np.uint16)
+    if table_dtype is not None:
+        values = values[v.view(table_dtype)]
     nx, ny, nz = v.shape
     rotation = np.radians(_plt.kwargs.get('rotation', 40))
     tilt = np.radians(_plt.kwargs.get('tilt', 70))
@@ -3417,8 +3904,10 @@ def _plot_iso(v):
         up = (0, 1, 0)
     else:
         up = (0, 0, 1)
+    # scalar trig, shared by the x and z coordinates of the camera
+    sin_tilt = math.sin(tilt)
     gr3.cameralookat(
-        r * np.sin(tilt) * np.sin(rotation), r * np.cos(tilt), r * np.sin(tilt) * np.cos(rotation),
+        r * sin_tilt * math.sin(rotation), r * math.cos(tilt), r * sin_tilt * math.cos(rotation),
         0, 0, 0,
         up[0], up[1], up[2]
     )
@@ -3431,35 +3920,48 @@ def _plot_polar(phi, rho):
     global _plt
     r_min, r_max = _plt.kwargs['rrange']
     if _plt.kwargs.get('adjust_rlim', True):
-        r_min, r_max = gr.adjustlimits(r_min, r_max)
+        r_min, r_max = _adjustlimits(r_min, r_max)
     phi_min, phi_max = np.radians(_phase_wrapped_philim(adjust=_plt.kwargs.get('adjust_philim', True)))
     phi = np.fmod(phi, 2 * np.pi)
     split_rho = np.logical_or(rho < r_min, rho > r_max)
     split_phi = np.logical_or(phi < phi_min, phi > phi_max)
-    split = np.where(np.logical_or(split_phi, split_rho))[0].astype(np.int)
+    # each point outside of the limits starts a new segment, like the indices of np.split
+    boundaries = np.concatenate(([0], np.flatnonzero(np.logical_or(split_phi, split_rho)), [len(rho)]))
     relative_r_min = r_min / r_max
-    rho = ((rho - r_min) / (r_max - r_min) * (1 - relative_r_min)) + relative_r_min
+    # rescale and flip in place on the first temporary, in the same order of operations
+    rho = rho - r_min
+    rho /= r_max - r_min
+    rho *= 1 - relative_r_min
+    rho += relative_r_min
     if _plt.kwargs.get('rflip', False):
-        rho = 1 + relative_r_min - rho
+        np.subtract(1 + relative_r_min, rho, out=rho)
     if _plt.kwargs.get('phiflip', False):
-        phi = phi_max + phi_min - phi
-    for r, a in zip(np.split(rho, split), np.split(phi, split)):
-        if not len(r) > 1:
-            continue
-        x = r * np.cos(a)
-        y = r * np.sin(a)
-        gr.polyline(x, y)
+        # phi is already a new array returned by np.fmod
+        np.subtract(phi_max + phi_min, phi, out=phi)
+    x = rho * np.cos(phi)
+    y = rho * np.sin(phi)
+    # only segments with at least two points are drawn, so the others are never sliced
+    drawn = np.flatnonzero(np.diff(boundaries) > 1)
+    for start, stop in zip(boundaries[drawn].tolist(), boundaries[drawn + 1].tolist()):
+        gr.polyline(x[start:stop], y[start:stop])
 
 
 def _convert_to_array(obj, may_be_2d=False, xvalues=None, always_flatten=False):
     global _plt
+    if type(obj) is np.ndarray and obj.dtype == np.float64:
+        # Arrays that already have the final shape and dtype would be returned unchanged by the checks below
+        if obj.ndim == 1 and (obj.flags.c_contiguous or not always_flatten):
+            return obj
+        if may_be_2d and not always_flatten and obj.ndim == 2 and obj.shape[0] > 1 and obj.shape[1] == 2:
+            return obj
     if callable(obj):
         if xvalues is None:
             raise TypeError('object is callable, but xvalues is None')
+        # map calls obj from C and the known count lets fromiter allocate the result once
         if len(xvalues.shape) == 1:
-            a = np.fromiter((obj(x) for x in xvalues), np.float64)
+            a = np.fromiter(map(obj, xvalues), np.float64, len(xvalues))
         else:
-            a = np.fromiter((obj(x, y) for x, y in xvalues), np.float64)
+            a = np.fromiter(map(obj, xvalues[:, 0], xvalues[:, 1]), np.float64, len(xvalues))
     else:
         a = obj
         try:
@@ -3573,9 +4075,10 @@ def _plot_bar():
             raise ValueError('Edge_width has to be bigger or equal to 0!')
 
     # Change individual color
-    pos_indcolor = []
+    pos_indcolor = set()
     changecolor = False
-    indcolors = [None for i in range(len(y_values) + 1)]
+    # rgb colors and edge widths of individual bars, indexed by bar position
+    indcolors = np.zeros((len(y_values) + 1, 3))
     if 'ind_bar_color' in kwargs:
         changecolor = True
         indcolor = kwargs.pop('ind_bar_color')
@@ -3606,17 +4109,17 @@ def _plot_bar():
                     raise ValueError('The values in colorpack[1] have to be in [0;1]!')
             indcolor_rgb = [colorpack[1][0], colorpack[1][1], colorpack[1][2]]
             if isinstance(colorpack[0], list):
-                pos_indcolor.extend(colorpack[0])
+                pos_indcolor.update(colorpack[0])
                 for index in colorpack[0]:
                     indcolors[index] = indcolor_rgb
             elif isinstance(colorpack[0], int):
-                pos_indcolor.append(colorpack[0])
+                pos_indcolor.add(colorpack[0])
                 indcolors[colorpack[0]] = indcolor_rgb
 
     # Change individual edgecolor
-    pos_indedgecolor = []
+    pos_indedgecolor = set()
     changeedgecolor = False
-    indedgecolors = [None for i in range(len(y_values) + 1)]
+    indedgecolors = np.zeros((len(y_values) + 1, 3))
     if 'ind_edge_color' in kwargs:
         changeedgecolor = True
         indedgecolor = kwargs.pop('ind_edge_color')
@@ -3645,17 +4148,17 @@ def _plot_bar():
                     raise ValueError('The values in colorpack[1] have to be in [0;1]!')
             indedgecolor_rgb = [colorpack[1][0], colorpack[1][1], colorpack[1][2]]
             if isinstance(colorpack[0], list):
-                pos_indedgecolor.extend(colorpack[0])
+                pos_indedgecolor.update(colorpack[0])
                 for index in colorpack[0]:
                     indedgecolors[index] = indedgecolor_rgb
             elif isinstance(colorpack[0], int):
-                pos_indedgecolor.append(colorpack[0])
+                pos_indedgecolor.add(colorpack[0])
                 indedgecolors[colorpack[0]] = indedgecolor_rgb
 
     # Change individual edge width
-    pos_indedgewidth = []
+    pos_indedgewidth = set()
     changeedgewidth = False
-    indedgewidths = [None for i in range(len(y_values) + 1)]
+    indedgewidths = np.zeros(len(y_values) + 1)
     if 'ind_edge_width' in kwargs:
         indedgewidth = kwargs.pop('ind_edge_width')
         if not isinstance(indedgewidth, list):
@@ -3676,143 +4179,94 @@ def _plot_bar():
                 changeedgewidth = True
                 ind_edgewidth = widthpack[1]
                 if isinstance(widthpack[0], list):
-                    pos_indedgewidth.extend(widthpack[0])
+                    pos_indedgewidth.update(widthpack[0])
                     for index in widthpack[0]:
                         indedgewidths[index] = ind_edgewidth
                 elif isinstance(widthpack[0], int):
-                    pos_indedgewidth.append(widthpack[0])
+                    pos_indedgewidth.add(widthpack[0])
                     indedgewidths[widthpack[0]] = ind_edgewidth
 
-    # Draw bars
+    def setcolor(color_or_rgb, setcolorind):
+        if isinstance(color_or_rgb, int):
+            setcolorind(color_or_rgb)
+        else:
+            gr.setcolorrep(color_save_spot, color_or_rgb[0], color_or_rgb[1], color_or_rgb[2])
+            setcolorind(color_save_spot)
+
+    # Bar rectangles in drawing order, with the 1-based position of each bar inside its group (multi_bar) or
+    # of the group itself, which selects the colors and edge width
+    x_values = np.arange(1, len(y_values) + 1)
     wfac = bar_width * 0.8
-    gr.setfillintstyle(1)
-    for a, y in enumerate(y_values):
-        x = a + 1
-        if style == 'stacked' and multi_bar:
-            c = 0
-            for i in range(0, len(y), 1):
-                if changecolor and (i + 1 in pos_indcolor):
-                    current_rgb = indcolors[i + 1]
-                    gr.setcolorrep(color_save_spot, current_rgb[0], current_rgb[1], current_rgb[2])
-                    gr.setfillcolorind(color_save_spot)
-                else:
-                    if colorlist:
-                        if isinstance(colorlist[i], int):
-                            gr.setfillcolorind(colorlist[i])
-                        else:
-                            current_rgb = colorlist[i]
-                            gr.setcolorrep(color_save_spot, current_rgb[0], current_rgb[1], current_rgb[2])
-                            gr.setfillcolorind(color_save_spot)
-                    else:
-                        gr.setfillcolorind(std_colors[i % len(std_colors)])
-                gr.fillrect((x - 0.5 * bar_width), (x + 0.5 * bar_width),
-                            c, (y[i] + c))
-                c = y[i] + c
-        elif style == 'lined' and multi_bar:
-            bar_width = wfac / (len(y))
-            for i in range(0, len(y), 1):
-                if changecolor and (i + 1 in pos_indcolor):
-                    current_rgb = indcolors[i + 1]
-                    gr.setcolorrep(color_save_spot, current_rgb[0], current_rgb[1], current_rgb[2])
-                    gr.setfillcolorind(color_save_spot)
-                else:
-                    if colorlist:
-                        if isinstance(colorlist[i], int):
-                            gr.setfillcolorind(colorlist[i])
-                        else:
-                            current_rgb = colorlist[i]
-                            gr.setcolorrep(color_save_spot, current_rgb[0], current_rgb[1], current_rgb[2])
-                            gr.setfillcolorind(color_save_spot)
-                    else:
-                        gr.setfillcolorind(std_colors[i % len(std_colors)])
-                gr.fillrect((x - 0.5 * wfac + bar_width * i),
-                            (x - 0.5 * wfac + bar_width + bar_width * i), 0,
-                            y[i])
+    if multi_bar and style in ('stacked', 'lined'):
+        num_positions = y_values.shape[1]
+        positions = list(range(1, num_positions + 1)) * len(y_values)
+        if style == 'stacked':
+            tops = np.cumsum(y_values, axis=1)
+            bottoms = np.zeros_like(tops)
+            bottoms[:, 1:] = tops[:, :-1]
+            lefts = np.repeat(x_values - 0.5 * bar_width, num_positions)
+            rights = np.repeat(x_values + 0.5 * bar_width, num_positions)
         else:
-            if changecolor and (x in pos_indcolor):
-                current_rgb = indcolors[x]
-                gr.setcolorrep(color_save_spot, current_rgb[0], current_rgb[1], current_rgb[2])
-                gr.setfillcolorind(color_save_spot)
-            else:
-                if colorlist:
-                    if isinstance(colorlist[a], int):
-                        gr.setfillcolorind(colorlist[a])
-                    else:
-                        current_rgb = colorlist[a]
-                        gr.setcolorrep(color_save_spot, current_rgb[0], current_rgb[1], current_rgb[2])
-                        gr.setfillcolorind(color_save_spot)
-                else:
-                    if isinstance(color, int):
-                        gr.setfillcolorind(color)
-                    else:
-                        current_rgb = color
-                        gr.setcolorrep(color_save_spot, current_rgb[0], current_rgb[1], current_rgb[2])
-                        gr.setfillcolorind(color_save_spot)
-            gr.fillrect((x - 0.5 * bar_width), (x + 0.5 * bar_width), 0, y)
+            bar_width = wfac / num_positions
+            offsets = bar_width * np.arange(num_positions)
+            lefts = ((x_values - 0.5 * wfac)[:, np.newaxis] + offsets).ravel()
+            rights = ((x_values - 0.5 * wfac + bar_width)[:, np.newaxis] + offsets).ravel()
+            tops = y_values
+            bottoms = np.zeros_like(tops)
+        default_colors = [std_colors[i % len(std_colors)] for i in range(num_positions)]
+    else:
+        num_positions = len(y_values)
+        positions = list(range(1, num_positions + 1))
+        lefts = x_values - 0.5 * bar_width
+        rights = x_values + 0.5 * bar_width
+        tops = y_values
+        bottoms = np.zeros_like(tops)
+        default_colors = [color] * num_positions
+    rects = list(zip(positions, lefts.tolist(), rights.tolist(), np.ravel(bottoms).tolist(), np.ravel(tops).tolist()))
+
+    fill_colors = [None] * (num_positions + 1)
+    edge_colors = [None] * (num_positions + 1)
+    edge_widths = [None] * (num_positions + 1)
+    for position in range(1, num_positions + 1):
+        if changecolor and position in pos_indcolor:
+            fill_colors[position] = indcolors[position]
+        elif colorlist:
+            fill_colors[position] = colorlist[position - 1]
+        else:
+            fill_colors[position] = default_colors[position - 1]
+        if changeedgecolor and position in pos_indedgecolor:
+            edge_colors[position] = indedgecolors[position]
+        else:
+            edge_colors[position] = edgecolor
+        if changeedgewidth and position in pos_indedgewidth:
+            edge_widths[position] = indedgewidths[position]
+        else:
+            edge_widths[position] = edgewidth
+
+    # Draw bars
+    gr.setfillintstyle(1)
+    for position, left, right, bottom, top in rects:
+        setcolor(fill_colors[position], gr.setfillcolorind)
+        gr.fillrect(left, right, bottom, top)
 
     # Draw edges
     gr.setfillintstyle(0)
-    for a, y in enumerate(y_values):
-        x = a + 1
-        if style == 'stacked' and multi_bar:
-            c = 0
-            for i in range(0, len(y), 1):
-                if changeedgecolor and (i + 1 in pos_indedgecolor):
-                    current_rgb = indedgecolors[i + 1]
-                    gr.setcolorrep(color_save_spot, current_rgb[0], current_rgb[1], current_rgb[2])
-                    gr.setlinecolorind(color_save_spot)
-                else:
-                    if isinstance(edgecolor, int):
-                        gr.setlinecolorind(edgecolor)
-                    else:
-                        current_rgb = edgecolor
-                        gr.setcolorrep(color_save_spot, current_rgb[0], current_rgb[1], current_rgb[2])
-                        gr.setlinecolorind(color_save_spot)
-                if changeedgewidth and (i + 1 in pos_indedgewidth):
-                    gr.setlinewidth(indedgewidths[i + 1])
-                else:
-                    gr.setlinewidth(edgewidth)
-                gr.drawrect((x - 0.5 * bar_width), (x + 0.5 * bar_width),
-                            c, (y[i] + c))
-                c = y[i] + c
-        elif style == 'lined' and multi_bar:
-            bar_width = wfac / (len(y))
-            for i in range(0, len(y), 1):
-                if changeedgecolor and (i + 1 in pos_indedgecolor):
-                    current_rgb = indedgecolors[i + 1]
-                    gr.setcolorrep(color_save_spot, current_rgb[0], current_rgb[1], current_rgb[2])
-                    gr.setlinecolorind(color_save_spot)
-                else:
-                    if isinstance(edgecolor, int):
-                        gr.setlinecolorind(edgecolor)
-                    else:
-                        current_rgb = edgecolor
-                        gr.setcolorrep(color_save_spot, current_rgb[0], current_rgb[1], current_rgb[2])
-                        gr.setlinecolorind(color_save_spot)
-                if changeedgewidth and (i + 1 in pos_indedgewidth):
-                    gr.setlinewidth(indedgewidths[i + 1])
-                else:
-                    gr.setlinewidth(edgewidth)
-                gr.drawrect((x - 0.5 * wfac + bar_width * i),
-                            (x - 0.5 * wfac + bar_width + bar_width * i), 0,
-                            y[i])
-        else:
-            if changeedgecolor and (x in pos_indedgecolor):
-                current_rgb = indedgecolors[x]
-                gr.setcolorrep(color_save_spot, current_rgb[0], current_rgb[1], current_rgb[2])
-                gr.setlinecolorind(color_save_spot)
-            else:
-                if isinstance(edgecolor, int):
-                    gr.setlinecolorind(edgecolor)
-                else:
-                    current_rgb = edgecolor
-                    gr.setcolorrep(color_save_spot, current_rgb[0], current_rgb[1], current_rgb[2])
-                    gr.setlinecolorind(color_save_spot)
-            if changeedgewidth and (x in pos_indedgewidth):
-                gr.setlinewidth(indedgewidths[x])
-            else:
-                gr.setlinewidth(edgewidth)
-            gr.drawrect((x - 0.5 * bar_width), (x + 0.5 * bar_width), 0, y)
+    for position, left, right, bottom, top in rects:
+        setcolor(edge_colors[position], gr.setlinecolorind)
+        gr.setlinewidth(edge_widths[position])
+        gr.drawrect(left, right, bottom, top)
+
+
+# polar histogram colormap images, keyed by the colormap indices of the columns and rows and the image size
+_colormap_image_cache = _LRUCache(4)
+
+
+def _colormap_index(colormap):
+    if isinstance(colormap, int):
+        return colormap
+    elif isinstance(colormap, str):
+        return gr.COLORMAPS[colormap]
+    raise ValueError('Invalid colormap parameter')
 
 
 def _create_colormap(tup):
@@ -3825,83 +4279,129 @@ def _create_colormap(tup):
     else:
         size = tup[2]
 
-    if tup[0] is None and tup[1] is None:
-        gr.setcolormap(0)
-        COLORMAP_Y = np.array(_colormap() * 255, dtype=int)
-        COLORMAP_X = np.zeros((256, 4))
-        factor = 1
+    x_index = None if tup[0] is None else _colormap_index(tup[0])
+    y_index = None if tup[1] is None else _colormap_index(tup[1])
+    if x_index is None and y_index is None:
+        y_index = 0
 
-    elif tup[0] is not None and tup[1] is None:
-        if isinstance(tup[0], int):
-            gr.setcolormap(tup[0])
-        elif isinstance(tup[0], str):
-            gr.setcolormap(gr.COLORMAPS[tup[0]])
-        else:
-            raise ValueError('Invalid colormap parameter')
+    key = (x_index, y_index, size)
+    pixmap = _colormap_image_cache.get(key)
+    if pixmap is not None:
+        # building the image leaves the last used colormap set
+        _setcolormap(x_index if y_index is None else y_index)
+        return pixmap
 
+    if x_index is not None:
+        _setcolormap(x_index)
         COLORMAP_X = np.array(_colormap() * 255, dtype=int)
-        COLORMAP_Y = np.zeros((256, 4))
-        factor = 1
-
-    elif tup[0] is None and tup[1] is not None:
-        if isinstance(tup[1], int):
-            gr.setcolormap(tup[1])
-        elif isinstance(tup[1], str):
-            gr.setcolormap(gr.COLORMAPS[tup[1]])
-        else:
-            raise ValueError('Invalid colormap parameter')
+    else:
         COLORMAP_X = np.zeros((256, 4))
+    if y_index is not None:
+        _setcolormap(y_index)
         COLORMAP_Y = np.array(_colormap() * 255, dtype=int)
-        factor = 1
-
     else:
-        if isinstance(tup[0], int):
-            gr.setcolormap(tup[0])
-        elif isinstance(tup[0], str):
-            gr.setcolormap(gr.COLORMAPS[tup[0]])
-        else:
-            raise ValueError('Invalid colormap parameter')
-        COLORMAP_X = np.array(_colormap() * 255, dtype=int)
-
-        if isinstance(tup[1], int):
-            gr.setcolormap(tup[1])
-        elif isinstance(tup[1], str):
-            gr.setcolormap(gr.COLORMAPS[tup[1]])
-        else:
-            raise ValueError('Invalid colormap parameter')
-        COLORMAP_Y = np.array(_colormap() * 255, dtype=int)
-        factor = 2
+        COLORMAP_Y = np.zeros((256, 4))
+    factor = 2 if x_index is not None and y_index is not None else 1
 
     size_range = range(256)
     lins_float = np.linspace(0, 255, num=size)
 
-    r1 = np.array(np.interp(lins_float, size_range, COLORMAP_X[size_range, 0])).reshape(1, -1)
-    r2 = np.array(np.interp(lins_float, size_range, COLORMAP_Y[size_range, 0])).reshape(-1, 1)
-    r12 = np.array((r1 + r2) / factor, dtype=np.int)
+    # interpolated red, green, blue and alpha values along the columns and rows of the image
+    column_channels = np.array([np.interp(lins_float, size_range, COLORMAP_X[size_range, channel])
+                                for channel in range(4)])
+    row_channels = np.array([np.interp(lins_float, size_range, COLORMAP_Y[size_range, channel])
+                             for channel in range(4)])
 
-    g1 = np.array(np.interp(lins_float, size_range, COLORMAP_X[size_range, 1])).reshape(1, -1)
-    g2 = np.array(np.interp(lins_float, size_range, COLORMAP_Y[size_range, 1])).reshape(-1, 1)
-    g12 = np.left_shift(np.array((g1 + g2) / factor, dtype=np.int), 8)
+    if _colormap_pixmap_numba is not None and size * size > _HIST_NUMBA_THRESHOLD:
+        pixmap = _colormap_pixmap_numba(column_channels, row_channels, factor, np.empty((size, size), np.int64))
+    else:
+        pixmap = np.zeros((size, size), np.int64)
+        for channel in range(4):
+            values = np.add.outer(row_channels[channel], column_channels[channel])
+            if factor != 1:
+                values /= factor
+            pixmap |= values.astype(np.int64) << (8 * channel)
 
-    b1 = np.array(np.interp(lins_float, size_range, COLORMAP_X[size_range, 2])).reshape(1, -1)
-    b2 = np.array(np.interp(lins_float, size_range, COLORMAP_Y[size_range, 2])).reshape(-1, 1)
-    b12 = np.left_shift(np.array((b1 + b2) / factor, dtype=np.int), 16)
+    # the image is shared by all redraws with the same colormaps and size
+    pixmap.flags.writeable = False
+    _colormap_image_cache.put(key, pixmap)
+    return pixmap
 
-    a1 = np.array(np.interp(lins_float, size_range, COLORMAP_X[size_range, 3])).reshape(1, -1)
-    a2 = np.array(np.interp(lins_float, size_range, COLORMAP_Y[size_range, 3])).reshape(-1, 1)
-    a12 = np.left_shift(np.array((a1 + a2) / factor, dtype=np.int), 24)
 
-    pixmap = np.array(r12 | g12 | b12 | a12)
+# pixel grids of the last polar histogram colormap images, keyed by image and colormap size
+_polar_grid_cache = _LRUCache(4)
 
-    return np.ascontiguousarray(pixmap)
+
+def _polar_grid(height, width, colormap_rows, colormap_cols):
+    """
+    Return the radius, angle and flat colormap index of every pixel of a polar histogram colormap image.
+
+    The arrays only depend on the image and colormap size and are cached for redraws. They are shared between
+    calls and therefore read-only.
+    """
+    key = (height, width, colormap_rows, colormap_cols)
+    grid = _polar_grid_cache.get(key)
+    if grid is None:
+        center = width / 2
+        # single precision is sufficient to find the bin and colormap entry of
+        # a pixel and halves the size of the full image arrays
+        Y, X = np.ogrid[:height, :width]
+        dx = (X - center).astype(np.float32)
+        dy = (Y - center).astype(np.float32)
+        radiusc = np.hypot(dx, dy)
+        angle_c = np.arctan2(dy, dx)
+        angle_c[angle_c < 0] += np.float32(2 * np.pi)
+        factor_angle_b = colormap_cols / (2 * np.pi)
+        angle_b = (angle_c * np.float32(factor_angle_b)).astype(np.int32)
+        factor_radiusb2 = (colormap_rows - 1) / (center * 2 ** (1 / 2))
+        radiusb2 = (radiusc * np.float32(factor_radiusb2)).astype(np.int32)
+        colormap_index = (radiusb2 * colormap_cols + angle_b).ravel()
+        grid = (radiusc, angle_c, colormap_index)
+        for array in grid:
+            array.flags.writeable = False
+        _polar_grid_cache.put(key, grid)
+    return grid
+
+
+def _polar_sector_mask(angle_c, radiusc, angles, radii, r_min, r_max):
+    """
+    Return the pixels of a polar histogram image which are covered by a bin.
+
+    A pixel is covered by a bin if its angle is in [angle1, angle2] of the bin
+    and its radius is at most the radius of the bin and in [r_min, r_max].
+    Instead of testing every bin against every pixel, the largest radius for
+    each angle is looked up in a table over the sorted bin boundaries.
+    """
+    num_bins = min(len(angles), len(radii))
+    angles = np.asarray(angles[:num_bins], dtype=np.float64).reshape(num_bins, 2)
+    boundaries = np.unique(angles)
+    # slot 2 * i + 1 holds the largest radius at boundaries[i] and slot 2 * i the largest radius between
+    # boundaries[i - 1] and boundaries[i]; the first and last slot lie outside of all bins
+    max_radius = np.full(2 * len(boundaries) + 1, -np.inf)
+    for (angle1, angle2), radius in zip(angles, radii[:num_bins]):
+        first = np.searchsorted(boundaries, angle1)
+        last = np.searchsorted(boundaries, angle2)
+        if first <= last:
+            slots = max_radius[2 * first + 1:2 * last + 2]
+            np.maximum(slots, radius, out=slots)
+    slot = np.searchsorted(boundaries, angle_c, side='left') + np.searchsorted(boundaries, angle_c, side='right')
+    return (radiusc <= max_radius[slot]) & (radiusc <= r_max) & (r_min <= radiusc)
 
 
 def _plot_polar_histogram():
+    # cosine and sine of the n + 1 angles 2 * x * pi / n used by moivre, keyed by n
+    moivre_tables = {}
+
     def moivre(r, x, n):
         list1 = [1, 0]
         if n != 0:
-            list1[0] = r ** (1 / n) * (np.cos((2 * x * np.pi) / n))
-            list1[1] = r ** (1 / n) * (np.sin((2 * x * np.pi) / n))
+            if n not in moivre_tables:
+                angles = (2 * np.arange(n + 1) * np.pi) / n
+                moivre_tables[n] = (np.cos(angles), np.sin(angles))
+            cos_table, sin_table = moivre_tables[n]
+            radius = r ** (1 / n)
+            list1[0] = radius * cos_table[x]
+            list1[1] = radius * sin_table[x]
         return list1
 
     global _plt
@@ -3954,8 +4454,9 @@ def _plot_polar_histogram():
     norm_factor = _plt.kwargs['norm_factor']
     normalization = _plt.kwargs['normalization']
 
-    classes = _plt.kwargs['classes']
-    del _plt.kwargs['classes']
+    counts = _plt.kwargs['temp_bin_counts']
+    del _plt.kwargs['temp_bin_counts']
+    empty_mask = counts == 0
 
     if _plt.kwargs.get('bin_edges', None) is not None:
         is_binedges = True
@@ -3968,6 +4469,9 @@ def _plot_polar_histogram():
         binedges = _plt.kwargs['temp_bin_edges']
         del _plt.kwargs['temp_bin_edges']
 
+    # packed colors of the bins if a colormap is drawn without radial gradient
+    bin_colors = _plt.kwargs.pop('temp_bin_colors', None)
+
     temp = _plt.kwargs['border_exp']
     border = temp[0]
     exp = temp[1]
@@ -3976,7 +4480,7 @@ def _plot_polar_histogram():
 
     gr.settransparency(0.8)
 
-    num_bins = len(classes)
+    num_bins = len(counts)
 
     if _plt.kwargs.get('rlim', None) is not None:
         r_min = _plt.kwargs['rlim']
@@ -3998,6 +4502,8 @@ def _plot_polar_histogram():
                 raise ValueError('RGB Triplet not correct')
         elif not isinstance(facecolor, int):
             raise ValueError('face_color not correct')
+    if bin_colors is not None and temp_face is None:
+        temp_face = gr.inqcolor(1004)
 
     # face_alpha
     if 'face_alpha' in _plt.kwargs:
@@ -4064,38 +4570,33 @@ def _plot_polar_histogram():
                         norm_factor = 1
 
                     if normalization == 'countdensity' or normalization == 'pdf':
-                        binwidths = []
-                        classes = [temp for temp in classes if len(temp) > 0]
-
-                        for i in range(len(binedges) - 1):
-                            binwidths.append(binedges[i + 1] - binedges[i])
-                        binwidths.append(binedges[-1] - binedges[-2])
+                        # the trailing bin past the last edge reuses the last bin width
+                        binwidths = np.diff(np.asarray(binedges, np.float64))
+                        binwidths = np.append(binwidths, binwidths[-1])
 
-                        bin_value = [len(x) / (norm_factor * binwidths[i]) if x[0] is not None else 0
-                                     for (i, x) in enumerate(classes)]
+                        bin_value = np.where(empty_mask, 0, counts / (norm_factor * np.asarray(binwidths[:num_bins])))
                     else:
-                        bin_value = [len(x) / (norm_factor) if x[0] is not None else 0
-                                     for (i, x) in enumerate(classes)]
+                        bin_value = np.where(empty_mask, 0, counts / norm_factor)
 
                 else:
-                    bin_value = [len(x) / norm_factor if x is not None else 0 for x in classes]
+                    bin_value = np.where(empty_mask, 0, counts / norm_factor)
 
                 length = 0
                 mlist = []
 
-                for x in range(len(classes)):
+                for x in range(num_bins):
                     if normalization == 'cumcount' or normalization == 'cdf':
-                        if classes[x][0] is None:
+                        if empty_mask[x]:
                             pass
                         else:
-                            length = len(classes[x]) / norm_factor + length
-                    elif classes[x][0] is None:
+                            length = counts[x] / norm_factor + length
+                    elif empty_mask[x]:
                         continue
                     elif normalization == 'pdf' or normalization == 'countdensity':
                         length = bin_value[x]
 
                     else:
-                        length = len(classes[x]) / norm_factor
+                        length = counts[x] / norm_factor
 
                     r = (length / border * 0.4) ** (num_bins * 2)
                     liste = moivre(r, (2 * x), num_bins * 2)
@@ -4192,53 +4693,50 @@ def _plot_polar_histogram():
                 pass
             elif normalization == 'countdensity':
                 norm_factor = 1
-            binwidths = []
-            classes = [bin for bin in classes if len(bin) > 0]
-            for i in range(len(binedges) - 1):
-                binwidths.append(binedges[i + 1] - binedges[i])
-            binwidths.append(binedges[-1] - binedges[-2])
+            # the trailing bin past the last edge reuses the last bin width
+            binwidths = np.diff(np.asarray(binedges, np.float64))
+            binwidths = np.append(binwidths, binwidths[-1])
 
             if normalization == 'countdensity' or normalization == 'pdf':
-                bin_value = [len(x) / (norm_factor * binwidths[i]) for (i, x) in enumerate(classes)]
+                # empty bins are drawn with the height of a single value
+                bin_value = np.where(empty_mask, 1, counts) / (norm_factor * np.asarray(binwidths[:num_bins]))
 
             else:
-                bin_value = [len(x) / norm_factor if x[0] is not None else 0 for x in classes]
+                bin_value = np.where(empty_mask, 0, counts / norm_factor)
 
         # No binedges
         else:
-            if normalization == 'countdensity':
-                bin_value = [len(x) / norm_factor if x[0] is not None else 0 for x in classes]
-
-            elif normalization == 'pdf':
-                bin_value = [len(x) / (norm_factor) if x[0] is not None else 0 for x in classes]
-
-            else:
-                bin_value = [len(x) / norm_factor if x[0] is not None else 0 for x in classes]
+            bin_value = np.where(empty_mask, 0, counts / norm_factor)
 
         # no stairs
         if _plt.kwargs.get('stairs', False) is False:
 
             mlist = []
 
-            for x in range(len(classes)):
+            for x in range(num_bins):
 
                 if normalization == 'cumcount' or normalization == 'cdf':
-                    if classes[x][0] is None:
+                    if empty_mask[x]:
                         pass
                     else:
-                        length = len(classes[x]) / norm_factor + length
+                        length = counts[x] / norm_factor + length
                 elif normalization == 'pdf' or normalization == 'countdensity':
                     length = bin_value[x]
-                elif classes[x][0] is None:
+                elif empty_mask[x]:
                     continue
                 else:
-                    length = len(classes[x]) / norm_factor
+                    length = counts[x] / norm_factor
 
                 r = (length / border * 0.4) ** (num_bins * 2)
                 liste = moivre(r, (2 * x), num_bins * 2)
                 rect = np.sqrt(liste[0] ** 2 + liste[1] ** 2)
 
-                gr.setfillcolorind(facecolor)
+                if bin_colors is not None:
+                    color = bin_colors[x]
+                    gr.setcolorrep(1004, (color & 255) / 255, ((color >> 8) & 255) / 255, ((color >> 16) & 255) / 255)
+                    gr.setfillcolorind(1004)
+                else:
+                    gr.setfillcolorind(facecolor)
                 gr.settransparency(facealpha)
                 gr.setfillintstyle(1)
 
@@ -4274,23 +4772,27 @@ def _plot_polar_histogram():
                                 diff_angle = end_angle - start_angle
                                 num_angle = int(diff_angle / (0.2 / convert)) * 1j
                                 phi_array = np.array(
-                                    np.ogrid[start_angle: end_angle:num_angle], dtype=np.float)
+                                    np.ogrid[start_angle: end_angle:num_angle], dtype=np.float64)
+                                cos_phi = np.cos(phi_array)
+                                sin_phi = np.sin(phi_array)
 
-                                arc_1_x = [r * np.cos(phi) + 0.5 for phi in phi_array]
-                                arc_1_y = [r * np.sin(phi) + 0.5 for phi in phi_array]
+                                arc_1_x = r * cos_phi + 0.5
+                                arc_1_y = r * sin_phi + 0.5
 
-                                arc_2_x = [r_min * 0.4 * np.cos(phi) + 0.5 for phi in phi_array]
-                                arc_2_y = [r_min * 0.4 * np.sin(phi) + 0.5 for phi in phi_array]
+                                arc_2_x = r_min * 0.4 * cos_phi + 0.5
+                                arc_2_y = r_min * 0.4 * sin_phi + 0.5
 
-                                line_1_x = [0.5 + r_min * 0.4 * np.cos(binedges[x]),
-                                            0.5 + min(rect, r_max * 0.4) * np.cos(binedges[x])]
-                                line_1_y = [0.5 + r_min * 0.4 * np.sin(binedges[x]),
-                                            0.5 + min(rect, r_max * 0.4) * np.sin(binedges[x])]
+                                cos_start, sin_start = np.cos(start_angle), np.sin(start_angle)
+                                cos_end, sin_end = np.cos(end_angle), np.sin(end_angle)
+                                line_1_x = [0.5 + r_min * 0.4 * cos_start,
+                                            0.5 + min(rect, r_max * 0.4) * cos_start]
+                                line_1_y = [0.5 + r_min * 0.4 * sin_start,
+                                            0.5 + min(rect, r_max * 0.4) * sin_start]
 
-                                line_2_x = [0.5 + r_min * 0.4 * np.cos(binedges[x + 1]),
-                                            0.5 + min(rect, r_max * 0.4) * np.cos(binedges[x + 1])]
-                                line_2_y = [0.5 + r_min * 0.4 * np.sin(binedges[x + 1]),
-                                            0.5 + min(rect, r_max * 0.4) * np.sin(binedges[x + 1])]
+                                line_2_x = [0.5 + r_min * 0.4 * cos_end,
+                                            0.5 + min(rect, r_max * 0.4) * cos_end]
+                                line_2_y = [0.5 + r_min * 0.4 * sin_end,
+                                            0.5 + min(rect, r_max * 0.4) * sin_end]
 
                                 gr.setfillintstyle(1)
                                 gr.fillarea(np.hstack((
@@ -4342,13 +4844,15 @@ def _plot_polar_histogram():
                                 diff_angle = end_angle - start_angle
                                 num_angle = int(diff_angle / (0.2 / convert)) * 1j
                                 phi_array = np.array(
-                                    np.ogrid[start_angle: end_angle:num_angle], dtype=np.float)
+                                    np.ogrid[start_angle: end_angle:num_angle], dtype=np.float64)
+                                cos_phi = np.cos(phi_array)
+                                sin_phi = np.sin(phi_array)
 
-                                arc_1_x = [r * np.cos(phi) + 0.5 for phi in phi_array]
-                                arc_1_y = [r * np.sin(phi) + 0.5 for phi in phi_array]
+                                arc_1_x = r * cos_phi + 0.5
+                                arc_1_y = r * sin_phi + 0.5
 
-                                arc_2_x = [r_min * 0.4 * np.cos(phi) + 0.5 for phi in phi_array]
-                                arc_2_y = [r_min * 0.4 * np.sin(phi) + 0.5 for phi in phi_array]
+                                arc_2_x = r_min * 0.4 * cos_phi + 0.5
+                                arc_2_y = r_min * 0.4 * sin_phi + 0.5
 
                                 line_1_x = [0.5 + r_min_list[0], 0.5 + mlist[2 * x][0]]
                                 line_1_y = [0.5 + r_min_list[1], 0.5 + mlist[2 * x][1]]
@@ -4397,18 +4901,18 @@ def _plot_polar_histogram():
                 mlist = []
                 rectlist = []
 
-                for x in range(len(classes)):
+                for x in range(num_bins):
                     if normalization == 'cumcount' or normalization == 'cdf':
-                        if classes[x][0] is None:
+                        if empty_mask[x]:
                             pass
                         else:
-                            length = len(classes[x]) / norm_factor + length
+                            length = counts[x] / norm_factor + length
                     elif normalization == 'pdf' or normalization == 'countdensity':
                         length = bin_value[x]
-                    elif classes[x][0] is None:
+                    elif empty_mask[x]:
                         length = 0
                     else:
-                        length = len(classes[x]) / norm_factor
+                        length = counts[x] / norm_factor
 
                     r = (length / border * 0.4) ** (num_bins * 2)
                     liste = moivre(r, (2 * x), num_bins * 2)
@@ -4515,17 +5019,17 @@ def _plot_polar_histogram():
             else:
 
                 mlist = []
-                for x in range(len(classes)):
+                for x in range(num_bins):
 
                     if normalization == 'cumcount' or normalization == 'cdf':
-                        if classes[x][0] is None:
+                        if empty_mask[x]:
                             pass
                         else:
-                            length = length + len(classes[x]) / norm_factor
-                    elif classes[x][0] is None:
+                            length = length + counts[x] / norm_factor
+                    elif empty_mask[x]:
                         length = 0
                     else:
-                        length = len(classes[x]) / norm_factor
+                        length = counts[x] / norm_factor
 
                     r = (length / border * 0.4) ** (num_bins * 2)
                     liste = moivre(r, (2 * x), num_bins * 2)
@@ -4563,7 +5067,7 @@ def _plot_polar_histogram():
                         gr.drawarc(0.5 - rect, 0.5 + rect, 0.5 - rect, 0.5 + rect, x * (360 / num_bins),
                                    (x + 1) * (360 / num_bins))
                 if is_rlim:
-                    for x in range(len(classes) * 2):
+                    for x in range(num_bins * 2):
                         if x > 1 and x % 2 == 0:
                             rect1 = np.sqrt(mlist[x][0]**2 + mlist[x][1]**2)
                             rect1 = round(int(rect1 * 10000) / 10000, 3)
@@ -4573,12 +5077,12 @@ def _plot_polar_histogram():
                             if rect1 < (r_min * 0.4) and rect2 < (r_min * 0.4):
                                 continue
                             if rect1 < r_min * 0.4:
-                                mlist[x][0] = r_min * 0.4 * np.cos(np.pi / len(classes) * x)
-                                mlist[x][1] = r_min * 0.4 * np.sin(np.pi / len(classes) * x)
+                                mlist[x][0] = r_min * 0.4 * np.cos(np.pi / num_bins * x)
+                                mlist[x][1] = r_min * 0.4 * np.sin(np.pi / num_bins * x)
 
                             if rect2 < r_min * 0.4:
-                                mlist[x - 1][0] = r_min * 0.4 * np.cos(np.pi / len(classes) * x)
-                                mlist[x - 1][1] = r_min * 0.4 * np.sin(np.pi / len(classes) * x)
+                                mlist[x - 1][0] = r_min * 0.4 * np.cos(np.pi / num_bins * x)
+                                mlist[x - 1][1] = r_min * 0.4 * np.sin(np.pi / num_bins * x)
 
                             gr.polyline([0.5 + mlist[x][0], 0.5 + mlist[x - 1][0]],
                                         [0.5 + mlist[x][1], 0.5 + mlist[x - 1][1]])
@@ -4592,7 +5096,7 @@ def _plot_polar_histogram():
                                 [0.5 + mlist[-1][1], 0.5 + mlist[0][1]])
 
                 else:
-                    for x in range(len(classes) * 2):
+                    for x in range(num_bins * 2):
                         if x > 1 and x % 2 == 0:
                             gr.polyline([0.5 + mlist[x][0], 0.5 + mlist[x - 1][0]],
                                         [0.5 + mlist[x][1], 0.5 + mlist[x - 1][1]])
@@ -4614,7 +5118,64 @@ def _plot_polar_histogram():
     gr.updatews()
 
 
+# parsed plot arguments, keyed on the identity and memory layout of the arrays. Only results that use the argument
+# arrays without copying them are kept, so changes made to the arrays in place are seen by later plots.
+_plot_args_cache = _LRUCache(4)
+
+
+def _plot_args_cache_clear():
+    """
+    Clear the cache of parsed plot arguments.
+    """
+    _plot_args_cache.clear()
+
+
+def _plot_args_cache_key(args, fmt):
+    key = [fmt]
+    for arg in args:
+        if isinstance(arg, np.ndarray):
+            key.append((id(arg), arg.ctypes.data, arg.shape, arg.strides, arg.dtype.str))
+        elif isinstance(arg, basestring):
+            key.append(arg)
+        else:
+            # lists, callables and iterators may change between calls
+            return None
+    return tuple(key)
+
+
+def _plot_args_cacheable(args, parsed_args):
+    """
+    Return whether the parsed arguments only consist of views of the argument arrays and of index ranges.
+
+    A parsed copy (e.g. of an integer array) or a grid computed from the values would not follow in-place changes
+    of the arguments. Index ranges only depend on the shapes, which are part of the cache key.
+    """
+    arrays = [arg for arg in args if isinstance(arg, np.ndarray)]
+    parsed = [v for parsed_arg in parsed_args for v in parsed_arg if isinstance(v, np.ndarray)]
+    for arg in arrays:
+        if not any(np.may_share_memory(arg, v) for v in parsed):
+            return False
+    for v in parsed:
+        if v.dtype.kind not in 'iu' and not any(np.may_share_memory(arg, v) for arg in arrays):
+            return False
+    return True
+
+
 def _plot_args(args, fmt='xys'):
+    key = _plot_args_cache_key(args, fmt)
+    entry = _plot_args_cache.get(key) if key is not None else None
+    if entry is not None:
+        cached_args, parsed_args = entry
+    else:
+        parsed_args = _parse_plot_args(args, fmt)
+        if key is not None and _plot_args_cacheable(args, parsed_args):
+            # keep a reference to the arguments so that their ids stay valid
+            _plot_args_cache.put(key, (tuple(args), parsed_args))
+    # return views, so that reshaping the plot data does not alter the cache
+    return [tuple(v.view() if isinstance(v, np.ndarray) else v for v in parsed_arg) for parsed_arg in parsed_args]
+
+
+def _parse_plot_args(args, fmt='xys'):
     global _plt
     args = list(args)
     parsed_args = []
@@ -4657,7 +5218,9 @@ def _plot_args(args, fmt='xys'):
 
         if x is None or column > 0:
             if column == 0:
-                a = np.array(args[0])
+                # only the shape is inspected here, so ndarrays (e.g. large point
+                # clouds passed to scatter, hexbin or shade) are not copied
+                a = np.asarray(args[0])
 
             if len(a.shape) == 2 and a.shape[0] == 2:
                 x, y = a[0, :], a[1, :]